@@ -5,5 +5,12 @@ provide a user-friendly interface for the I2C bus
 
 # the following imports are provided for user convenience
 # flake8: noqa: F401
-from feeph.i2c.burst_handler import BurstHandler, BurstHandle
+from feeph.i2c.broker import BrokerConnection, BrokeredI2C, BusBroker
+from feeph.i2c.burst_handler import BurstHandle, BurstHandler, BurstStatistics
+from feeph.i2c.emulated_devices import EmulatedDevice, FifoDevice, RegisterDevice
 from feeph.i2c.emulation import EmulatedI2C
+from feeph.i2c.multiplexer import I2CMultiplexer, MultiplexedI2C
+from feeph.i2c.polling import AdaptivePoller, RegisterChange
+from feeph.i2c.prefetch import Prefetcher, Snapshot
+from feeph.i2c.presence import PresenceCache
+from feeph.i2c.scan import scan, scan_buses
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+run a recurring task in a background thread
+
+This module provides the thread management shared by `AdaptivePoller` and
+`Prefetcher`.
+"""
+
+import abc
+import logging
+import threading
+
+LH = logging.getLogger("i2c")
+
+# upper limit for a single wait (in seconds)
+_MAX_WAIT_S = 1.0
+
+
+class BackgroundLoop(abc.ABC):
+    """
+    base class for classes performing a recurring task in a background
+    thread
+
+    Subclasses must implement `_run_once()`. It is called repeatedly until
+    the loop is stopped and returns the number of seconds to wait before
+    the next call (None = wait until woken up). Set `_wakeup` to cut the
+    wait short (e.g. after the configuration was changed). A single wait
+    never exceeds one second. Errors raised by `_run_once()` are logged
+    and the loop continues.
+    """
+
+    def __init__(self):
+        self._wakeup = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._is_running = False
+
+    def start(self):
+        """
+        start running in a background thread
+        """
+        if self._thread is not None:
+            raise RuntimeError(f"{type(self).__name__} is already running!")
+        self._is_running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        stop running in the background
+        """
+        self._is_running = False
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    @abc.abstractmethod
+    def _run_once(self) -> float | None:
+        """
+        perform the recurring task once and return the number of seconds
+        to wait before the next call
+        """
+
+    def _loop(self):
+        while True:
+            # clear the event before checking the flag - otherwise a call
+            # to 'stop()' in between would go unnoticed
+            self._wakeup.clear()
+            if not self._is_running:
+                break
+            try:
+                timeout = self._run_once()
+            # an unexpected error must not stop the background thread
+            # pylint: disable=broad-exception-caught
+            except Exception as e:
+                LH.exception("[%s] %s failed: %s", __name__, type(self).__name__, e)
+                timeout = _MAX_WAIT_S
+            if timeout is None or timeout > _MAX_WAIT_S:
+                timeout = _MAX_WAIT_S
+            if timeout > 0:
+                self._wakeup.wait(timeout=timeout)
@@ -0,0 +1,558 @@
+#!/usr/bin/env python3
+"""
+share a single I²C bus between multiple processes
+
+A broker owns the I²C bus and executes burst requests on behalf of its
+clients. Clients connect via a Unix domain socket and may send multiple
+requests without waiting for the previous response (pipelining). The
+broker serves its clients in a round-robin fashion and executes each
+request atomically.
+
+usage:
+```
+import busio
+import feeph.i2c
+
+# broker process
+i2c_bus = busio.I2C(...)
+with feeph.i2c.BusBroker(i2c_bus=i2c_bus, socket_path="/run/i2c-1.sock") as broker:
+    broker.serve_forever()
+
+# client process (drop-in replacement for busio.I2C)
+i2c_bus = feeph.i2c.BrokeredI2C(socket_path="/run/i2c-1.sock")
+
+with feeph.i2c.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x4C) as bh:
+    value = bh.read_register(register)
+
+# client process (batched and pipelined requests)
+future1 = i2c_bus.submit([("write_read", 0x4C, b"\\x00", 1), ("write_read", 0x4C, b"\\x01", 1)])
+future2 = i2c_bus.submit([("write", 0x4C, b"\\x10\\x34")])
+values = future1.result()
+```
+
+supported operations:
+- `("write", <address>, <bytes>)`                -> None
+- `("read", <address>, <length>)`                -> bytes
+- `("write_read", <address>, <bytes>, <length>)` -> bytes
+"""
+
+import collections
+import concurrent.futures
+import itertools
+import json
+import logging
+import os
+import socket
+import stat
+import struct
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any
+
+# module busio provides no type hints
+import busio  # type: ignore
+
+LH = logging.getLogger("i2c")
+
+# every message is prefixed with its length (4 bytes, big endian)
+_HEADER = struct.Struct(">I")
+
+
+def _send_message(sock: socket.socket, message: dict[str, Any]):
+    payload = json.dumps(message).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes | None:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            return None
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+def _recv_message(sock: socket.socket) -> dict[str, Any] | None:
+    """
+    receive a single message or return None if the connection was closed
+    """
+    header = _recv_exactly(sock, _HEADER.size)
+    if header is None:
+        return None
+    payload = _recv_exactly(sock, _HEADER.unpack(header)[0])
+    if payload is None:
+        return None
+    return json.loads(payload.decode("utf-8"))
+
+
+def _encode_ops(ops: list[tuple]) -> list[dict[str, Any]]:
+    encoded = list()
+    for op in ops:
+        if op[0] == "write":
+            encoded.append({"op": "write", "adr": op[1], "data": bytes(op[2]).hex()})
+        elif op[0] == "read":
+            encoded.append({"op": "read", "adr": op[1], "len": op[2]})
+        elif op[0] == "write_read":
+            encoded.append({"op": "write_read", "adr": op[1], "data": bytes(op[2]).hex(), "len": op[3]})
+        else:
+            raise ValueError(f"Unsupported operation '{op[0]}'!")
+    return encoded
+
+
+class _BrokerClient:
+    """
+    internal abstraction - !! do not instantiate !!
+
+    bookkeeping for a single client connected to the broker
+    """
+
+    def __init__(self, client_id: int, sock: socket.socket):
+        self.client_id = client_id
+        self.sock = sock
+        self.queue: collections.deque = collections.deque()
+        self.last_seen_ns = time.monotonic_ns()
+
+
+class BusBroker:
+    """
+    own an I²C bus and execute burst requests on behalf of other processes
+
+    - requests are queued per client and the clients are served in a
+      round-robin fashion (one request per client and round)
+    - each request is executed atomically
+    - a client may lock the bus for a sequence of requests ("session"),
+      the session is released if the client remains idle for longer than
+      `session_timeout_ms`
+    """
+
+    def __init__(self, i2c_bus: busio.I2C, socket_path: str, session_timeout_ms: int = 1000):
+        self._i2c_bus = i2c_bus
+        self._socket_path = socket_path
+        if isinstance(session_timeout_ms, int) and session_timeout_ms > 0:
+            self._session_timeout_ns = session_timeout_ms * 1000 * 1000
+        else:
+            raise ValueError("Provided session timeout is not a positive integer!")
+        self._cv = threading.Condition()
+        self._clients: dict[int, _BrokerClient] = dict()
+        self._client_ids = itertools.count(1)
+        self._next_index = 0
+        self._session: _BrokerClient | None = None
+        self._is_running = False
+        self._server: socket.socket | None = None
+        self._threads: list[threading.Thread] = list()
+
+    def __enter__(self) -> "BusBroker":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        self.stop()
+
+    def start(self):
+        """
+        start accepting clients in the background
+        """
+        # remove a stale socket left behind by a previous broker
+        if os.path.exists(self._socket_path) and stat.S_ISSOCK(os.stat(self._socket_path).st_mode):
+            os.unlink(self._socket_path)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self._socket_path)
+        self._server.listen()
+        # use a timeout so the accept loop is able to notice a shutdown
+        self._server.settimeout(0.1)
+        self._is_running = True
+        for target in (self._accept_loop, self._schedule_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        LH.debug("[%s] Broker is listening on '%s'.", __name__, self._socket_path)
+
+    def serve_forever(self):
+        """
+        block until the broker is stopped
+        """
+        for thread in list(self._threads):
+            thread.join()
+
+    def stop(self):
+        """
+        disconnect all clients and stop the broker
+        """
+        with self._cv:
+            if not self._is_running:
+                return
+            self._is_running = False
+            self._cv.notify_all()
+        if self._server is not None:
+            self._server.close()
+        # wait for the accept loop to finish before disconnecting clients
+        # (otherwise we might miss a client that connected just now)
+        self._threads[0].join()
+        with self._cv:
+            clients = list(self._clients.values())
+        for client in clients:
+            _close_socket(client.sock)
+        for thread in self._threads[1:]:
+            thread.join()
+        self._threads.clear()
+        with self._cv:
+            if self._session is not None:
+                self._session = None
+                self._i2c_bus.unlock()
+        if os.path.exists(self._socket_path):
+            os.unlink(self._socket_path)
+
+    # ---------------------------------------------------------------------
+
+    def _accept_loop(self):
+        while self._is_running:
+            try:
+                sock, _ = self._server.accept()  # type: ignore[union-attr]
+            except socket.timeout:
+                continue
+            except OSError:
+                # listening socket was closed
+                break
+            sock.settimeout(None)
+            client = _BrokerClient(client_id=next(self._client_ids), sock=sock)
+            with self._cv:
+                self._clients[client.client_id] = client
+            thread = threading.Thread(target=self._receive_loop, args=(client,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+            LH.debug("[%s] Client %d connected.", __name__, client.client_id)
+
+    def _receive_loop(self, client: _BrokerClient):
+        while True:
+            try:
+                message = _recv_message(client.sock)
+            except (OSError, ValueError):
+                message = None
+            with self._cv:
+                if message is None:
+                    client.queue.append(None)  # client disconnected
+                elif isinstance(message, dict):
+                    client.queue.append(message)
+                else:
+                    # malformed request - answered with an error response
+                    client.queue.append({"id": None, "type": None})
+                self._cv.notify_all()
+            if message is None:
+                break
+
+    def _next_message(self) -> tuple[_BrokerClient, dict[str, Any] | None] | None:
+        """
+        wait for the next message to be processed
+
+        (must be called while holding the condition variable)
+        """
+        while self._is_running:
+            session = self._session
+            if session is not None:
+                # the client holding the session is served exclusively
+                if session.queue:
+                    return session, session.queue.popleft()
+                idle_ns = time.monotonic_ns() - session.last_seen_ns
+                if idle_ns > self._session_timeout_ns:
+                    LH.warning("[%s] Client %d held the bus for too long. Releasing its session.", __name__, session.client_id)
+                    self._release_session()
+                    continue
+                self._cv.wait(timeout=(self._session_timeout_ns - idle_ns) / 1_000_000_000)
+                continue
+            # round-robin across all clients
+            clients = list(self._clients.values())
+            for offset in range(len(clients)):
+                idx = (self._next_index + offset) % len(clients)
+                if clients[idx].queue:
+                    self._next_index = idx + 1
+                    return clients[idx], clients[idx].queue.popleft()
+            self._cv.wait()
+        return None
+
+    def _schedule_loop(self):
+        while True:
+            with self._cv:
+                entry = self._next_message()
+                if entry is None:
+                    break
+                client, message = entry
+                client.last_seen_ns = time.monotonic_ns()
+                if message is None:
+                    self._clients.pop(client.client_id, None)
+                    if self._session is client:
+                        self._release_session()
+                    _close_socket(client.sock)
+                    LH.debug("[%s] Client %d disconnected.", __name__, client.client_id)
+                    continue
+            self._process(client, message)
+
+    def _process(self, client: _BrokerClient, message: dict[str, Any]):
+        response: dict[str, Any] = {"id": message.get("id"), "results": None, "error": None}
+        try:
+            request_type = message.get("type")
+            if request_type == "lock":
+                if self._session is not client:
+                    self._acquire_bus()
+                with self._cv:
+                    self._session = client
+            elif request_type == "unlock":
+                with self._cv:
+                    if self._session is client:
+                        self._release_session()
+            elif request_type == "burst":
+                if self._session is client:
+                    response["results"] = self._execute(message["ops"])
+                elif message.get("session"):
+                    # the client expects to hold the session but it was
+                    # released in the meantime (e.g. it timed out)
+                    raise RuntimeError("The session expired! The request was not executed.")
+                else:
+                    self._acquire_bus()
+                    try:
+                        response["results"] = self._execute(message["ops"])
+                    finally:
+                        self._i2c_bus.unlock()
+            else:
+                raise ValueError(f"Unsupported request type '{request_type}'!")
+        except OSError as e:
+            response["error"] = {"errno": e.errno, "message": str(e)}
+        # forward all errors to the client instead of killing the broker
+        # pylint: disable=broad-exception-caught
+        except Exception as e:
+            response["error"] = {"errno": None, "message": f"{type(e).__name__}: {e}"}
+        try:
+            _send_message(client.sock, response)
+        except OSError:
+            # client is gone, the receive loop will notice it
+            pass
+
+    def _acquire_bus(self):
+        # the broker is supposed to be the only user of the I²C bus
+        while not self._i2c_bus.try_lock():
+            time.sleep(0.001)
+
+    def _release_session(self):
+        self._session = None
+        self._i2c_bus.unlock()
+        self._cv.notify_all()
+
+    def _execute(self, ops: list[dict[str, Any]]) -> list[str | None]:
+        results: list[str | None] = list()
+        for op in ops:
+            if op["op"] == "write":
+                self._i2c_bus.writeto(address=op["adr"], buffer=bytearray.fromhex(op["data"]))
+                results.append(None)
+            elif op["op"] == "read":
+                buf = bytearray(op["len"])
+                self._i2c_bus.readfrom_into(address=op["adr"], buffer=buf)
+                results.append(buf.hex())
+            elif op["op"] == "write_read":
+                buf = bytearray(op["len"])
+                self._i2c_bus.writeto_then_readfrom(address=op["adr"], buffer_out=bytearray.fromhex(op["data"]), buffer_in=buf)
+                results.append(buf.hex())
+            else:
+                raise ValueError(f"Unsupported operation '{op['op']}'!")
+        return results
+
+
+def _close_socket(sock: socket.socket):
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    sock.close()
+
+
+class BrokerConnection:
+    """
+    a connection to a BusBroker
+
+    All requests are pipelined: they are sent immediately and a Future is
+    returned which will hold the result once the broker responds.
+    """
+
+    def __init__(self, socket_path: str):
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.connect(socket_path)
+        self._send_lock = threading.Lock()
+        self._pending: dict[int, Future] = dict()
+        self._pending_lock = threading.Lock()
+        self._request_ids = itertools.count(1)
+        self._reader = threading.Thread(target=self._receive_loop, daemon=True)
+        self._reader.start()
+
+    def submit(self, ops: list[tuple], session: bool = False) -> Future:
+        """
+        send a burst of operations to the broker
+        (the operations are executed atomically)
+
+        If `session` is True the burst is expected to be part of this
+        client's session and fails if the session is no longer held.
+        """
+        return self._request({"type": "burst", "ops": _encode_ops(ops), "session": session})
+
+    def lock(self) -> Future:
+        """
+        request exclusive access to the I²C bus
+        """
+        return self._request({"type": "lock"})
+
+    def unlock(self) -> Future:
+        """
+        release exclusive access to the I²C bus
+        """
+        return self._request({"type": "unlock"})
+
+    def close(self):
+        _close_socket(self._sock)
+        self._reader.join()
+
+    def _request(self, message: dict[str, Any]) -> Future:
+        future: Future = Future()
+        with self._pending_lock:
+            message["id"] = next(self._request_ids)
+            self._pending[message["id"]] = future
+        try:
+            with self._send_lock:
+                _send_message(self._sock, message)
+        except OSError as e:
+            with self._pending_lock:
+                self._pending.pop(message["id"], None)
+            raise RuntimeError("Unable to send request to the I²C broker!") from e
+        return future
+
+    def _receive_loop(self):
+        while True:
+            try:
+                message = _recv_message(self._sock)
+            except (OSError, ValueError):
+                message = None
+            if message is None:
+                break
+            with self._pending_lock:
+                future = self._pending.pop(message["id"], None)
+            if future is None:
+                continue
+            error = message["error"]
+            if error is None:
+                future.set_result([bytes.fromhex(x) if x is not None else None for x in (message["results"] or [])])
+            elif error["errno"] is not None:
+                future.set_exception(OSError(error["errno"], error["message"]))
+            else:
+                future.set_exception(RuntimeError(error["message"]))
+        # connection was closed, fail all outstanding requests
+        with self._pending_lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for future in pending:
+            future.set_exception(RuntimeError("Lost the connection to the I²C broker!"))
+
+
+class BrokeredI2C(busio.I2C):
+    """
+    access an I²C bus owned by a BusBroker (drop-in replacement for busio.I2C)
+
+    Acquiring the lock requests a session from the broker. 'try_lock()'
+    never blocks, the lock request is queued by the broker and granted
+    once it's this client's turn. Use 'cancel_lock()' to withdraw a
+    pending lock request. If the broker releases the session (e.g. after
+    it was idle for too long) all further requests fail until the lock
+    is released.
+    """
+
+    # We intentionally do not call super().init() because we don't want to
+    # call any of the hardware initialization code.
+    # pylint: disable=super-init-not-called
+    def __init__(self, socket_path: str, timeout_ms: int = 5000):
+        self._connection = BrokerConnection(socket_path=socket_path)
+        if isinstance(timeout_ms, int) and timeout_ms > 0:
+            self._timeout = timeout_ms / 1000
+        else:
+            raise ValueError("Provided timeout is not a positive integer!")
+        self._state_lock = threading.Lock()
+        self._lock_request: Future | None = None
+        self._is_locked = False
+
+    def deinit(self):
+        self._connection.close()
+
+    def try_lock(self) -> bool:
+        with self._state_lock:
+            if self._is_locked:
+                return False
+            if self._lock_request is None:
+                self._lock_request = self._connection.lock()
+            if not self._lock_request.done():
+                return False
+            failed = self._lock_request.exception() is not None
+            self._lock_request = None
+            if failed:
+                return False
+            self._is_locked = True
+            return True
+
+    def unlock(self):
+        with self._state_lock:
+            if self._is_locked:
+                # no need to wait for the broker's confirmation
+                self._connection.unlock()
+                self._is_locked = False
+
+    def cancel_lock(self):
+        """
+        withdraw a pending lock request (e.g. after giving up on acquiring
+        the lock)
+
+        Otherwise the broker would grant the lock eventually and block
+        all other clients until the session times out.
+        """
+        with self._state_lock:
+            if self._lock_request is not None:
+                # requests are processed in order, the broker releases
+                # the session as soon as it was granted
+                self._connection.unlock()
+                self._lock_request = None
+
+    def submit(self, ops: list[tuple]) -> Future:
+        """
+        send a burst of operations to the broker without waiting for the
+        result (see module documentation for supported operations)
+
+        While the lock is held the burst fails if the broker released the
+        session in the meantime.
+        """
+        return self._connection.submit(ops, session=self._is_locked)
+
+    def _execute(self, ops: list[tuple]) -> list:
+        future = self._connection.submit(ops, session=self._is_locked)
+        try:
+            return future.result(timeout=self._timeout)
+        # not the same as the builtin TimeoutError on Python 3.10
+        except concurrent.futures.TimeoutError as e:
+            raise RuntimeError("timed out while waiting for the I²C broker") from e
+
+    # replicate the signature of busio.I2C
+    # pylint: disable=too-many-arguments
+    def readfrom_into(self, address: int, buffer: bytearray, *, start=0, end=None, stop=True):
+        if end is None:
+            end = len(buffer)
+        (data,) = self._execute([("read", address, end - start)])
+        buffer[start:end] = data
+
+    # replicate the signature of busio.I2C
+    # pylint: disable=too-many-arguments
+    def writeto(self, address: int, buffer: bytearray, *, start=0, end=None):
+        if end is None:
+            end = len(buffer)
+        self._execute([("write", address, buffer[start:end])])
+
+    def writeto_then_readfrom(self, address: int, buffer_out: bytearray, buffer_in: bytearray, *,
+                              out_start=0, out_end=None, in_start=0, in_end=None, stop=False):
+        if out_end is None:
+            out_end = len(buffer_out)
+        if in_end is None:
+            in_end = len(buffer_in)
+        (data,) = self._execute([("write_read", address, buffer_out[out_start:out_end], in_end - in_start)])
+        buffer_in[in_start:in_end] = data
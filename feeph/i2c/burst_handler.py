@@ -16,15 +16,24 @@ with feeph.i2c.Burst(i2c_bus=i2c_bus, i2c_adr=0x4C) as bh:
 with feeph.i2c.Burst(i2c_bus=i2c_bus, i2c_adr=0x70) as bh:
     value = bh.get_state()
     bh.set_state(value + 1)
+
+# drain a large FIFO in chunks of 32 reads and let more important bursts
+# (higher priority) access the bus in between
+with feeph.i2c.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x68, max_hold_ms=5, priority=-1) as bh:
+    samples = bh.read_registers([0x74] * 1024, chunk_size=32)
 ```
 """
 
 import logging
+import threading
 import time
+import weakref
+from typing import Callable, Iterable
 
 # module busio provides no type hints
 import busio  # type: ignore
 from feeph.i2c.conversions import convert_bytearry_to_uint, convert_uint_to_bytearry
+from feeph.i2c.presence import PresenceCache
 
 LH = logging.getLogger("i2c")
 
@@ -36,12 +45,13 @@ class BurstHandle:
     Please use `feeph.i2c.BurstHandler() instead`.
     """
 
-    def __init__(self, i2c_bus: busio.I2C, i2c_adr: int):
+    def __init__(self, i2c_bus: busio.I2C, i2c_adr: int, burst_handler: "BurstHandler | None" = None):
         self._i2c_bus = i2c_bus
         if 0 <= i2c_adr <= 255:
             self._i2c_adr = i2c_adr
         else:
             raise ValueError(f"Provided I²C address {i2c_adr} is out of range! (allowed range: 0 ≤ x ≤ 255)")
+        self._burst_handler = burst_handler
 
     # fundamentally there isn't actually much difference between accesses
     # to a device's register or internal state
@@ -63,8 +73,7 @@ class BurstHandle:
         - may raise a RuntimeError if there were too many errors
         """
         _validate_register_address(register)
-        buf_r = bytearray(byte_count)
-        buf_r[0] = register
+        buf_r = bytearray([register])
         buf_w = bytearray(byte_count)
         cur_try = 0
         for cur_try in range(1, 1 + max_tries):
@@ -158,6 +167,189 @@ class BurstHandle:
                 time.sleep(0.1)
         raise RuntimeError(f"Unable to write state after {cur_try} attempts. Giving up.")
 
+    # bulk operations are split into chunks, the lock on the I²C bus may
+    # be released and reacquired between two chunks (see 'checkpoint()')
+
+    def read_registers(self, registers: Iterable[int], byte_count: int = 1, max_tries: int = 5,
+                       chunk_size: int | None = None) -> list[int]:
+        """
+        read multiple registers from I²C device identified by `i2c_adr` and
+        return their contents as a list of integer values
+        - the same register may be provided multiple times (e.g. a FIFO)
+        - the lock may be yielded every `chunk_size` reads
+        - each chunk is read in a single combined transfer if the I²C bus
+          supports it (e.g. `feeph.i2c.linux.LinuxI2C`)
+        - may raise a RuntimeError if there were too many errors
+        """
+        _validate_chunk_size(chunk_size)
+        registers = list(registers)
+        for register in registers:
+            _validate_register_address(register)
+        step = chunk_size or max(len(registers), 1)
+        values = list()
+        for offset in range(0, len(registers), step):
+            if offset > 0:
+                self.checkpoint()
+            values.extend(self._read_chunk(registers[offset:offset + step], byte_count=byte_count, max_tries=max_tries))
+        return values
+
+    def _read_chunk(self, registers: list[int], byte_count: int, max_tries: int) -> list[int]:
+        scatter_read = getattr(self._i2c_bus, "scatter_read", None)
+        if scatter_read is None:
+            return [self.read_register(register, byte_count=byte_count, max_tries=max_tries) for register in registers]
+        # each transfer is retried on its own - repeating transfers which
+        # already succeeded would read FIFO registers twice
+        step = getattr(self._i2c_bus, "scatter_read_limit", None) or max(len(registers), 1)
+        values = list()
+        for offset in range(0, len(registers), step):
+            batch = registers[offset:offset + step]
+            values.extend(self._scatter_read(scatter_read, batch, byte_count=byte_count, max_tries=max_tries))
+        return values
+
+    def _scatter_read(self, scatter_read: Callable, registers: list[int], byte_count: int, max_tries: int) -> list[int]:
+        cur_try = 0
+        for cur_try in range(1, 1 + max_tries):
+            try:
+                return [convert_bytearry_to_uint(buf) for buf in scatter_read(self._i2c_adr, registers, byte_count)]
+            # protect against sporadic errors on actual devices
+            except (OSError, RuntimeError) as e:
+                # [Errno 121] Remote I/O error
+                LH.warning("[%s] Unable to read %i registers (%i/%i): %s", __name__, len(registers), cur_try, max_tries, e)
+                time.sleep(0.001)
+        raise RuntimeError(f"Unable to read {len(registers)} registers after {cur_try} attempts. Giving up.")
+
+    def write_registers(self, values: Iterable[tuple[int, int]], byte_count: int = 1, max_tries: int = 3,
+                        chunk_size: int | None = None):
+        """
+        write multiple registers to I²C device identified by `i2c_adr`
+        - values are provided as (register, value) pairs
+        - the lock may be yielded every `chunk_size` writes
+        - may raise a ValueError if the provided value is out of range
+        - may raise a RuntimeError if there were too many errors
+        """
+        _validate_chunk_size(chunk_size)
+        for idx, (register, value) in enumerate(values):
+            if chunk_size is not None and idx > 0 and idx % chunk_size == 0:
+                self.checkpoint()
+            self.write_register(register, value, byte_count=byte_count, max_tries=max_tries)
+
+    def checkpoint(self) -> bool:
+        """
+        temporarily release the lock on the I²C bus if another burst with
+        a higher priority is waiting for it (or if the hold-time budget was
+        exceeded and a burst with the same priority is waiting)
+
+        Returns True if the lock was released and reacquired.
+        - may raise a RuntimeError if it was not possible to reacquire
+            the bus within allowed time
+        """
+        if self._burst_handler is None:
+            return False
+        return self._burst_handler._yield_if_requested()
+
+
+class BurstStatistics:
+    """
+    hold-time statistics of a single BurstHandler
+
+    A hold period starts when the lock on the I²C bus is acquired and ends
+    when it is released (either at the end of the burst or by yielding the
+    lock to another burst in between two chunks).
+    """
+
+    def __init__(self):
+        self.acquisitions    = 0  # number of hold periods
+        self.yields          = 0  # number of times the lock was yielded
+        self.total_hold_ns   = 0  # accumulated time the lock was held
+        self.max_hold_ns     = 0  # longest single hold period
+        self.budget_exceeded = 0  # number of hold periods exceeding 'max_hold_ms'
+
+    def __repr__(self) -> str:
+        return (f"BurstStatistics(acquisitions={self.acquisitions}, yields={self.yields}, "
+                f"total_hold_ns={self.total_hold_ns}, max_hold_ns={self.max_hold_ns}, budget_exceeded={self.budget_exceeded})")
+
+
+class _BusArbiter:
+    """
+    internal abstraction - !! do not instantiate !!
+
+    keep track of the bursts waiting for a specific I²C bus
+
+    busio.I2C only provides 'try_lock()' and has no concept of waiters or
+    priorities. We keep track of the waiting bursts ourselves so that the
+    current lock holder is able to tell if someone more important is
+    waiting. (This bookkeeping is limited to the current process.)
+
+    Each waiting burst draws a ticket. Tickets are handed out in
+    ascending order and allow a burst to defer only to bursts which were
+    already waiting at a certain point in time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiting: dict[int, int] = dict()  # ticket -> priority
+        self._next_ticket = 0
+
+    def register(self, priority: int) -> int:
+        """
+        register a waiting burst and return its ticket
+        """
+        with self._lock:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self._waiting[ticket] = priority
+            return ticket
+
+    def unregister(self, ticket: int):
+        with self._lock:
+            self._waiting.pop(ticket, None)
+
+    def next_ticket(self) -> int:
+        """
+        return the ticket the next waiting burst will draw
+        (all currently waiting bursts have a smaller ticket)
+        """
+        with self._lock:
+            return self._next_ticket
+
+    def has_waiters(self, min_priority: int, ignore: int | None = None, equal_before: int | None = None) -> bool:
+        """
+        is there at least one burst waiting with a priority ≥ min_priority?
+
+        - use `ignore` to exclude the caller's own ticket
+        - if `equal_before` is provided bursts with a priority of
+          `min_priority - 1` are considered as well, as long as their
+          ticket is smaller than `equal_before`
+        """
+        with self._lock:
+            for ticket, priority in self._waiting.items():
+                if ticket == ignore:
+                    continue
+                if priority >= min_priority:
+                    return True
+                if equal_before is not None and priority == min_priority - 1 and ticket < equal_before:
+                    return True
+            return False
+
+
+_ARBITERS: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_ARBITERS_LOCK = threading.Lock()
+
+
+def _get_arbiter(i2c_bus: busio.I2C) -> _BusArbiter:
+    # buses sharing the same physical bus (e.g. the channels of a
+    # multiplexer) must share the same arbiter as well
+    arbiter_key = getattr(i2c_bus, "_arbiter_key", None)
+    while arbiter_key is not None:
+        i2c_bus = arbiter_key()
+        arbiter_key = getattr(i2c_bus, "_arbiter_key", None)
+    with _ARBITERS_LOCK:
+        arbiter = _ARBITERS.get(i2c_bus)
+        if arbiter is None:
+            arbiter = _BusArbiter()
+            _ARBITERS[i2c_bus] = arbiter
+        return arbiter
+
 
 class BurstHandler:
     """
@@ -166,57 +358,168 @@ class BurstHandler:
     Technically speaking this I/O operation could span multiple devices
     but we're making an design choice and assume a single device is being
     used. This simplifies the user interface.
+
+    Bursts with a higher priority are preferred when acquiring the lock.
+    If `max_hold_ms` is provided the burst is expected to release the lock
+    within this time. Long-running bulk operations should be split into
+    chunks (see `BurstHandle.read_registers()`) so the lock can be yielded
+    to other waiting bursts between two chunks.
+
+    If a `presence_cache` is provided the burst fails immediately if the
+    device is known to be absent (see `feeph.i2c.scan()`).
     """
 
-    def __init__(self, i2c_bus: busio.I2C, i2c_adr: int, timeout_ms: int | None = 500):
+    # pylint: disable=too-many-arguments
+    def __init__(self, i2c_bus: busio.I2C, i2c_adr: int, timeout_ms: int | None = 500, max_hold_ms: int | None = None,
+                 priority: int = 0, presence_cache: PresenceCache | None = None):
         self._i2c_bus = i2c_bus
         self._i2c_adr = i2c_adr
-        if timeout_ms is None:
-            self._timeout_ms = None
-        elif isinstance(timeout_ms, int) and timeout_ms > 0:
-            self._timeout_ms = timeout_ms
+        _validate_timeout(timeout_ms)
+        self._timeout_ms = timeout_ms
+        if max_hold_ms is None:
+            self._max_hold_ms = None
+        elif isinstance(max_hold_ms, int) and max_hold_ms > 0:
+            self._max_hold_ms = max_hold_ms
         else:
-            raise ValueError("Provided timeout is not a positive integer or 'None'!")
-        # register '_timestart_ns' - we will populate it later on
+            raise ValueError("Provided hold-time budget is not a positive integer or 'None'!")
+        _validate_priority(priority)
+        self._priority = priority
+        self._presence_cache = presence_cache
+        self._arbiter = _get_arbiter(i2c_bus)
+        self.statistics = BurstStatistics()
+        # register '_timestart_ns' and '_holdstart_ns' - we will populate
+        # them later on
         self._timestart_ns = 0
+        self._holdstart_ns = 0
+        self._is_locked = False
 
     def __enter__(self) -> BurstHandle:
         """
         Try to acquire a lock for exclusive access on the I²C bus.
 
         Raises a RuntimeError if it wasn't possible to acquire the lock
-        within the given timeout.
+        within the given timeout or if the device is known to be absent.
         """
         LH.debug("[%d] Initializing an I²C I/O burst.", id(self))
+        if self._presence_cache is not None and self._presence_cache.get(self._i2c_bus, self._i2c_adr) is False:
+            raise RuntimeError(f"I²C device 0x{self._i2c_adr:02X} is known to be absent")
         # 0.001         = 1 millisecond
         # 0.000_001     = 1 microsecond
         # 0.000_000_001 = 1 nanosecond
         self._timestart_ns = time.perf_counter_ns()
-        sleep_time = 0.001  # 1 millisecond
-        if self._timeout_ms is not None:
-            timeout_ns = self._timeout_ms * 1000 * 1000
-            deadline = time.monotonic_ns() + timeout_ns
-            while not self._i2c_bus.try_lock():
-                if time.monotonic_ns() <= deadline:
-                    # I²C bus was busy, wait and retry
-                    time.sleep(sleep_time)  # time is given in seconds
-                else:
-                    # unable to acquire the lock
-                    raise RuntimeError("timed out before the I²C bus became available")
-        else:
-            while not self._i2c_bus.try_lock():
-                # I²C bus was busy, wait and retry
-                time.sleep(sleep_time)  # time is given in seconds
+        # defer to waiting bursts with a higher priority
+        self._acquire_lock()
         # successfully acquired a lock
         elapsed_ns = time.perf_counter_ns() - self._timestart_ns
         LH.debug("[%d] Acquired a lock on the I²C bus after %d ms.", id(self), elapsed_ns / (1000 * 1000))
-        return BurstHandle(i2c_bus=self._i2c_bus, i2c_adr=self._i2c_adr)
+        return BurstHandle(i2c_bus=self._i2c_bus, i2c_adr=self._i2c_adr, burst_handler=self)
 
     def __exit__(self, exc_type, exc_value, exc_tb):
         elapsed_ns = time.perf_counter_ns() - self._timestart_ns
         LH.debug("[%d] I²C I/O burst completed after %d ms.", id(self), elapsed_ns / (1000 * 1000))
-        LH.debug("[%d] Releasing the lock on the I²C bus.", id(self))
+        if self._is_locked:
+            LH.debug("[%d] Releasing the lock on the I²C bus.", id(self))
+            self._release_lock()
+
+    def _acquire_lock(self, equal_before: int | None = None):
+        """
+        acquire the lock on the I²C bus while deferring to all waiting
+        bursts with a higher priority
+
+        If `equal_before` is provided the burst defers to waiting bursts
+        with the same priority as well, but only to those which were
+        already waiting before the ticket `equal_before` was drawn.
+        (Deferring to every burst with the same priority would allow two
+        yielding bursts to defer to each other forever.)
+        """
+        sleep_time = 0.001  # 1 millisecond
+        if self._timeout_ms is not None:
+            deadline = time.monotonic_ns() + self._timeout_ms * 1000 * 1000
+        else:
+            deadline = None
+        ticket = self._arbiter.register(self._priority)
+        try:
+            while (self._arbiter.has_waiters(self._priority + 1, ignore=ticket, equal_before=equal_before)
+                   or not self._i2c_bus.try_lock()):
+                if deadline is None or time.monotonic_ns() <= deadline:
+                    # I²C bus was busy, wait and retry
+                    time.sleep(sleep_time)  # time is given in seconds
+                else:
+                    # unable to acquire the lock - withdraw a pending lock
+                    # request (if the I²C bus supports it, e.g. BrokeredI2C)
+                    cancel_lock = getattr(self._i2c_bus, "cancel_lock", None)
+                    if cancel_lock is not None:
+                        cancel_lock()
+                    raise RuntimeError("timed out before the I²C bus became available")
+        finally:
+            self._arbiter.unregister(ticket)
+        self._is_locked = True
+        self._holdstart_ns = time.perf_counter_ns()
+        self.statistics.acquisitions += 1
+
+    def _release_lock(self):
+        hold_ns = time.perf_counter_ns() - self._holdstart_ns
+        self._is_locked = False
         self._i2c_bus.unlock()
+        self.statistics.total_hold_ns += hold_ns
+        self.statistics.max_hold_ns = max(self.statistics.max_hold_ns, hold_ns)
+        if self._max_hold_ms is not None and hold_ns > self._max_hold_ms * 1000 * 1000:
+            self.statistics.budget_exceeded += 1
+            LH.debug("[%d] Held the lock on the I²C bus for %d ms. (budget: %d ms)",
+                     id(self), hold_ns / (1000 * 1000), self._max_hold_ms)
+
+    def _is_over_budget(self) -> bool:
+        if self._max_hold_ms is None:
+            return False
+        hold_ns = time.perf_counter_ns() - self._holdstart_ns
+        return hold_ns > self._max_hold_ms * 1000 * 1000
+
+    def _yield_if_requested(self) -> bool:
+        """
+        release and reacquire the lock if another burst should be allowed
+        to access the I²C bus first
+        """
+        if not self._is_locked:
+            return False
+        if self._arbiter.has_waiters(self._priority + 1):
+            equal_before = None
+        elif self._is_over_budget() and self._arbiter.has_waiters(self._priority):
+            # let the bursts with the same priority which are waiting right
+            # now go first (but not those arriving later on)
+            equal_before = self._arbiter.next_ticket()
+        else:
+            return False
+        LH.debug("[%d] Yielding the lock on the I²C bus.", id(self))
+        self._release_lock()
+        self.statistics.yields += 1
+        # give the waiting bursts a chance to grab the lock
+        time.sleep(0.001)
+        self._acquire_lock(equal_before=equal_before)
+        return True
+
+
+def _validate_chunk_size(chunk_size: int | None):
+    """
+    verify that the chunk size is either 'None' or a positive integer
+    """
+    if chunk_size is not None and (not isinstance(chunk_size, int) or chunk_size < 1):
+        raise ValueError("Provided chunk size is not a positive integer or 'None'!")
+
+
+def _validate_timeout(timeout_ms: int | None):
+    """
+    verify that the timeout is either 'None' or a positive integer
+    """
+    if timeout_ms is not None and (not isinstance(timeout_ms, int) or timeout_ms < 1):
+        raise ValueError("Provided timeout is not a positive integer or 'None'!")
+
+
+def _validate_priority(priority: int):
+    """
+    verify that the priority is an integer
+    """
+    if not isinstance(priority, int):
+        raise ValueError("Provided priority is not an integer!")
 
 
 def _validate_register_address(register: int):
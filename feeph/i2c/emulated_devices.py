@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+behavioral device models for EmulatedI2C
+
+A device model emulates the behavior of an actual device (register
+pointer, FIFOs, side effects, errors) instead of static register values.
+
+usage:
+```
+import feeph.i2c
+
+sensor = feeph.i2c.RegisterDevice(registers={0x00: 0x12, 0x01: 0x34}, read_to_clear=[0x01])
+fifo = feeph.i2c.FifoDevice(fifo_register=0x74, count_register=0x72, sample_rate_hz=100, sample_size=2)
+i2c_bus = feeph.i2c.EmulatedI2C(state={}, devices={0x4C: sensor, 0x68: fifo})
+
+# fail the next two transfers with "[Errno 121] Remote I/O error"
+sensor.inject_errors(count=2)
+```
+"""
+
+import abc
+import collections
+import errno
+import random
+import time
+from typing import Callable, Iterable
+
+
+class EmulatedDevice(abc.ABC):
+    """
+    base class for all device models
+
+    Subclasses must implement `read()` and `write()`. Errors can be
+    injected for any device, the error is raised before the transfer is
+    forwarded to the device model.
+    """
+
+    def __init__(self, seed: int | None = None):
+        self._faults: collections.deque = collections.deque()
+        self._error_rate = 0.0
+        self._error_errno = errno.EREMOTEIO
+        self._random = random.Random(seed)
+
+    def inject_errors(self, count: int = 1, error: int = errno.EREMOTEIO):
+        """
+        fail the next `count` transfers with the provided errno
+        (the default [Errno 121] is what a NACK looks like on Linux)
+        """
+        self._faults.extend([error] * count)
+
+    def set_error_rate(self, rate: float, error: int = errno.EREMOTEIO):
+        """
+        fail a random share of all transfers (0.0 ≤ rate ≤ 1.0)
+        """
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError(f"Provided error rate {rate} is out of range! (allowed range: 0.0 ≤ x ≤ 1.0)")
+        self._error_rate = rate
+        self._error_errno = error
+
+    def check_faults(self):
+        """
+        raise an OSError if an error was injected for this transfer
+        """
+        if self._faults:
+            error = self._faults.popleft()
+            raise OSError(error, errno.errorcode.get(error, "injected error"))
+        if self._error_rate > 0.0 and self._random.random() < self._error_rate:
+            raise OSError(self._error_errno, errno.errorcode.get(self._error_errno, "injected error"))
+
+    @abc.abstractmethod
+    def read(self, count: int) -> bytes:
+        """
+        read `count` bytes from the device
+        """
+
+    @abc.abstractmethod
+    def write(self, data: bytes):
+        """
+        write the provided bytes to the device
+        """
+
+    def write_then_read(self, data: bytes, count: int) -> bytes:
+        """
+        write the provided bytes and read `count` bytes (repeated start)
+        """
+        self.write(data)
+        return self.read(count)
+
+
+class RegisterDevice(EmulatedDevice):
+    """
+    a device with 8-bit registers and a register pointer
+
+    - the first byte of a write sets the register pointer, all following
+      bytes are written to consecutive registers
+    - a read returns the register(s) starting at the register pointer
+    - the register pointer is incremented after each byte (unless
+      `auto_increment` is disabled)
+    - unknown registers return `default`
+    - registers in `read_only` ignore writes
+    - registers in `read_to_clear` are reset to 0 after being read
+
+    Override `read_register()` and `write_register()` to emulate further
+    side effects.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, registers: dict[int, int] | None = None, default: int = 0x00, auto_increment: bool = True,
+                 read_only: Iterable[int] = (), read_to_clear: Iterable[int] = (), seed: int | None = None):
+        super().__init__(seed=seed)
+        self.registers = dict(registers) if registers else {}
+        self.pointer = 0x00
+        self._default = default
+        self._auto_increment = auto_increment
+        self._read_only = set(read_only)
+        self._read_to_clear = set(read_to_clear)
+
+    def read(self, count: int) -> bytes:
+        buf = bytearray(count)
+        for idx in range(count):
+            buf[idx] = self.read_register(self.pointer)
+            self.pointer = self.next_pointer(self.pointer)
+        return bytes(buf)
+
+    def write(self, data: bytes):
+        if not data:
+            # quick write (e.g. a probe) - nothing to do
+            return
+        self.pointer = data[0]
+        for value in data[1:]:
+            self.write_register(self.pointer, value)
+            self.pointer = self.next_pointer(self.pointer)
+
+    def read_register(self, register: int) -> int:
+        """
+        return the value of a single register
+        """
+        value = self.registers.get(register, self._default)
+        if register in self._read_to_clear:
+            self.registers[register] = 0x00
+        return value
+
+    def write_register(self, register: int, value: int):
+        """
+        change the value of a single register
+        """
+        if register not in self._read_only:
+            self.registers[register] = value
+
+    def next_pointer(self, register: int) -> int:
+        """
+        return the register pointer after accessing `register`
+        """
+        if self._auto_increment:
+            return (register + 1) & 0xFF
+        return register
+
+
+class FifoDevice(RegisterDevice):
+    """
+    a device which generates samples at a fixed rate and stores them in a
+    FIFO
+
+    - reading `fifo_register` returns the next byte of the FIFO (or 0 if
+      the FIFO is empty), the register pointer is not incremented
+    - reading `count_register` returns the number of complete samples in
+      the FIFO (capped at 255)
+    - samples are generated by `generator(<sample index>)` and stored in
+      big endian byte order
+    - if the FIFO is full the oldest sample is discarded and `overflows`
+      is incremented
+
+    Provide a custom `clock` (returning nanoseconds) to control the
+    passing of time.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, fifo_register: int, count_register: int | None = None, sample_rate_hz: float = 100.0,
+                 sample_size: int = 1, capacity: int = 32, generator: Callable[[int], int] | None = None,
+                 clock: Callable[[], int] = time.monotonic_ns, registers: dict[int, int] | None = None,
+                 seed: int | None = None):
+        super().__init__(registers=registers, seed=seed)
+        if sample_rate_hz <= 0:
+            raise ValueError("Provided sample rate must be positive!")
+        if not isinstance(sample_size, int) or sample_size < 1:
+            raise ValueError("Provided sample size is not a positive integer!")
+        if not isinstance(capacity, int) or capacity < 1:
+            raise ValueError("Provided capacity is not a positive integer!")
+        self._fifo_register = fifo_register
+        self._count_register = count_register
+        self._sample_rate_hz = sample_rate_hz
+        self._sample_size = sample_size
+        self._capacity = capacity
+        self._generator = generator if generator is not None else (lambda idx: idx)
+        self._clock = clock
+        self._fifo: collections.deque = collections.deque()
+        self._start_ns = clock()
+        self._generated = 0
+        self.overflows = 0
+
+    @property
+    def available(self) -> int:
+        """
+        number of complete samples in the FIFO
+        """
+        self._generate()
+        return len(self._fifo) // self._sample_size
+
+    def read_register(self, register: int) -> int:
+        if register == self._fifo_register:
+            self._generate()
+            return self._fifo.popleft() if self._fifo else 0x00
+        if register == self._count_register:
+            return min(self.available, 255)
+        return super().read_register(register)
+
+    def next_pointer(self, register: int) -> int:
+        if register == self._fifo_register:
+            return register
+        return super().next_pointer(register)
+
+    def _generate(self):
+        """
+        add all samples that were generated since the last access
+        """
+        elapsed_ns = self._clock() - self._start_ns
+        due = int(elapsed_ns * self._sample_rate_hz / 1_000_000_000)
+        max_value = pow(256, self._sample_size) - 1
+        if due - self._generated > self._capacity:
+            # only the most recent samples fit into the FIFO
+            skipped = due - self._generated - self._capacity
+            self.overflows += skipped
+            self._generated += skipped
+        while self._generated < due:
+            value = self._generator(self._generated) & max_value
+            if len(self._fifo) >= self._capacity * self._sample_size:
+                # discard the oldest sample
+                for _ in range(self._sample_size):
+                    self._fifo.popleft()
+                self.overflows += 1
+            self._fifo.extend(value.to_bytes(self._sample_size, byteorder="big"))
+            self._generated += 1
@@ -2,11 +2,13 @@
 """
 """
 
+import errno
 import random
 
 # module busio provide no type hints
 import busio  # type: ignore
 from feeph.i2c.conversions import convert_bytearry_to_uint, convert_uint_to_bytearry
+from feeph.i2c.emulated_devices import EmulatedDevice
 
 
 class EmulatedI2C(busio.I2C):
@@ -17,8 +19,13 @@ class EmulatedI2C(busio.I2C):
     written and test scenarios where it's hard or even impossible to
     acquire a lock on the I²C bus.
 
-    This code is unable to simulate device-specific behavior!
-    (e.g. duplicated registers with multiple addresses)
+    Devices provided in `state` hold static register values and are unable
+    to simulate device-specific behavior! (e.g. duplicated registers with
+    multiple addresses) Use `devices` to provide a device model instead.
+    (see `feeph.i2c.emulated_devices`)
+
+    Accessing an unknown device raises an OSError (Errno 121), the same
+    way an actual I²C bus would if no device acknowledges the address.
     """
 
     # We intentionally do not call super().init() because we don't want to
@@ -26,7 +33,8 @@ class EmulatedI2C(busio.I2C):
     # in being able to claim we are an instance of 'busio.I2C' in case
     # something else tries to validate that or has logic tied to it.
     # pylint: disable=super-init-not-called
-    def __init__(self, state: dict[int, dict[int, int]], lock_chance: int = 100):
+    def __init__(self, state: dict[int, dict[int, int]], lock_chance: int = 100,
+                 devices: dict[int, EmulatedDevice] | None = None):
         """
         initialize a simulated I2C bus
 
@@ -36,9 +44,13 @@ class EmulatedI2C(busio.I2C):
                 <register>: <value>,
             }
         }
+        devices = {
+            <device>: <EmulatedDevice>,
+        }
         ```
         """
         self._state = state.copy()
+        self._devices = dict(devices) if devices else {}
         self._lock_chance = lock_chance
         random.seed()
 
@@ -67,9 +79,16 @@ class EmulatedI2C(busio.I2C):
         # getting negative byte values or other unexpected data as input)
         if not isinstance(buffer, bytearray):
             raise ValueError("buffer must be of type 'bytearray'")
+        if address in self._devices:
+            device = self._devices[address]
+            device.check_faults()
+            view = memoryview(buffer)[start:end]
+            view[:] = device.read(len(view))
+            return
         i2c_device_address  = address
         i2c_device_register = -1
-        value = self._state[i2c_device_address][i2c_device_register]
+        # a device acknowledges a read even if it has no meaningful state
+        value = self._get_device(i2c_device_address).get(i2c_device_register, 0)
         ba = convert_uint_to_bytearry(value, len(buffer))
         # copy computed result to output parameter
         # pylint: disable=consider-using-enumerate
@@ -88,6 +107,11 @@ class EmulatedI2C(busio.I2C):
         # getting negative byte values or other unexpected data as input)
         if not isinstance(buffer, bytearray):
             raise ValueError("buffer must be of type 'bytearray'")
+        if address in self._devices:
+            device = self._devices[address]
+            device.check_faults()
+            device.write(bytes(buffer[start:end]))
+            return
         if len(buffer) == 1:
             # device status
             i2c_device_address  = address
@@ -98,9 +122,10 @@ class EmulatedI2C(busio.I2C):
             i2c_device_address  = address
             i2c_device_register = buffer[0]
             value = convert_bytearry_to_uint(buffer[1:])
-        self._state[i2c_device_address][i2c_device_register] = value
+        self._get_device(i2c_device_address)[i2c_device_register] = value
 
-    def writeto_then_readfrom(self, address: int, buffer_out: bytearray, buffer_in: bytearray, *, out_start=0, out_end=None, in_start=0, in_end=None, stop=False):
+    def writeto_then_readfrom(self, address: int, buffer_out: bytearray, buffer_in: bytearray, *,
+                              out_start=0, out_end=None, in_start=0, in_end=None, stop=False):
         """
         read device register
 
@@ -114,11 +139,26 @@ class EmulatedI2C(busio.I2C):
             raise ValueError("buffer_in must be of type 'bytearray'")
         if not isinstance(buffer_out, bytearray):
             raise ValueError("buffer_out must be of type 'bytearray'")
+        if address in self._devices:
+            device = self._devices[address]
+            device.check_faults()
+            view = memoryview(buffer_in)[in_start:in_end]
+            view[:] = device.write_then_read(bytes(buffer_out[out_start:out_end]), len(view))
+            return
         i2c_device_address  = address
         i2c_device_register = buffer_out[0]
-        value = self._state[i2c_device_address][i2c_device_register]
+        value = self._get_device(i2c_device_address)[i2c_device_register]
         ba = convert_uint_to_bytearry(value, len(buffer_in))
         # copy computed result to output parameter
         # pylint: disable=consider-using-enumerate
         for i in range(len(buffer_in)):
             buffer_in[i] = ba[i]
+
+    def _get_device(self, address: int) -> dict[int, int]:
+        """
+        return the state of the device or raise an OSError if there is no
+        device with this address
+        """
+        if address not in self._state:
+            raise OSError(errno.EREMOTEIO, "Remote I/O error")
+        return self._state[address]
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+access the I²C bus via the Linux i2c-dev interface (/dev/i2c-N)
+
+This backend bypasses Blinka and talks to the kernel directly. Each
+transfer is submitted as a single combined I2C_RDWR ioctl. Reading a
+register (write the register address, then read its value) is performed
+as one transaction with a repeated start condition. Reading multiple
+registers can be combined into a single ioctl as well.
+
+This backend is optional and only available on Linux.
+
+usage:
+```
+import feeph.i2c
+import feeph.i2c.linux
+
+i2c_bus = feeph.i2c.linux.LinuxI2C(bus_id=1)
+
+with feeph.i2c.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x4C) as bh:
+    # single ioctl for all three registers
+    values = bh.read_registers([0x00, 0x01, 0x10])
+```
+"""
+
+import ctypes
+import fcntl
+import logging
+import os
+import threading
+
+# module busio provides no type hints
+import busio  # type: ignore
+
+LH = logging.getLogger("i2c")
+
+# constants from <linux/i2c-dev.h> and <linux/i2c.h>
+I2C_RDWR = 0x0707
+I2C_M_RD = 0x0001
+I2C_RDWR_IOCTL_MAX_MSGS = 42
+
+
+class _I2cMsg(ctypes.Structure):
+    """
+    struct i2c_msg
+    """
+    _fields_ = [
+        ("addr",  ctypes.c_uint16),
+        ("flags", ctypes.c_uint16),
+        ("len",   ctypes.c_uint16),
+        ("buf",   ctypes.POINTER(ctypes.c_uint8)),
+    ]
+
+
+class _I2cRdwrIoctlData(ctypes.Structure):
+    """
+    struct i2c_rdwr_ioctl_data
+    """
+    _fields_ = [
+        ("msgs",  ctypes.POINTER(_I2cMsg)),
+        ("nmsgs", ctypes.c_uint32),
+    ]
+
+
+class LinuxI2C(busio.I2C):
+    """
+    access the I²C bus via /dev/i2c-N (drop-in replacement for busio.I2C)
+
+    The lock is exclusive within the current process (thread lock) and
+    across processes (advisory lock on the device file).
+    """
+
+    # number of registers 'scatter_read()' combines into a single ioctl
+    scatter_read_limit = I2C_RDWR_IOCTL_MAX_MSGS // 2
+
+    # We intentionally do not call super().init() because we don't want to
+    # call any of the hardware initialization code.
+    # pylint: disable=super-init-not-called
+    def __init__(self, bus_id: int):
+        self._device = f"/dev/i2c-{bus_id}"
+        self._fd = os.open(self._device, os.O_RDWR)
+        self._lock = threading.Lock()
+        # preallocate the message structures for all transfers
+        self._msgs = (_I2cMsg * I2C_RDWR_IOCTL_MAX_MSGS)()
+        self._rdwr = _I2cRdwrIoctlData(msgs=ctypes.cast(self._msgs, ctypes.POINTER(_I2cMsg)), nmsgs=0)
+        # one byte per message to hold register addresses for scatter reads
+        self._registers = (ctypes.c_uint8 * I2C_RDWR_IOCTL_MAX_MSGS)()
+
+    def deinit(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def try_lock(self) -> bool:
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            # locked by another process
+            self._lock.release()
+            return False
+        return True
+
+    def unlock(self):
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._lock.release()
+
+    def scan(self) -> list[int]:
+        """
+        return the addresses of all devices responding to a single byte read
+        """
+        found = list()
+        buf = bytearray(1)
+        for address in range(0x08, 0x78):
+            try:
+                self.readfrom_into(address, buf)
+                found.append(address)
+            except OSError:
+                pass
+        return found
+
+    # replicate the signature of busio.I2C
+    # pylint: disable=too-many-arguments
+    def readfrom_into(self, address: int, buffer: bytearray, *, start=0, end=None, stop=True):
+        """
+        read device state
+
+        (buffer is used as an output parameter)
+        """
+        view = memoryview(buffer)[start:end]
+        self._transfer([(address, I2C_M_RD, _as_ctypes(view))])
+
+    # replicate the signature of busio.I2C
+    # pylint: disable=too-many-arguments
+    def writeto(self, address: int, buffer: bytearray, *, start=0, end=None):
+        """
+        write device state or register
+        """
+        data = bytearray(buffer[start:end])
+        self._transfer([(address, 0, _as_ctypes(data))])
+
+    def writeto_then_readfrom(self, address: int, buffer_out: bytearray, buffer_in: bytearray, *,
+                              out_start=0, out_end=None, in_start=0, in_end=None, stop=False):
+        """
+        read device register (single transaction with a repeated start)
+
+        (buffer_in is used as an output parameter)
+        """
+        data = bytearray(buffer_out[out_start:out_end])
+        view = memoryview(buffer_in)[in_start:in_end]
+        self._transfer([(address, 0, _as_ctypes(data)), (address, I2C_M_RD, _as_ctypes(view))])
+
+    def scatter_read(self, address: int, registers: list[int], byte_count: int = 1) -> list[bytearray]:
+        """
+        read multiple (not necessarily consecutive) registers and return
+        their raw contents
+
+        Up to 21 registers are combined into a single ioctl.
+        """
+        results = [bytearray(byte_count) for _ in registers]
+        per_ioctl = self.scatter_read_limit
+        base = ctypes.addressof(self._registers)
+        for offset in range(0, len(registers), per_ioctl):
+            messages = list()
+            for idx in range(offset, min(offset + per_ioctl, len(registers))):
+                slot = idx - offset
+                self._registers[slot] = registers[idx]
+                messages.append((address, 0, (ctypes.c_uint8 * 1).from_address(base + slot)))
+                messages.append((address, I2C_M_RD, _as_ctypes(results[idx])))
+            self._transfer(messages)
+        return results
+
+    def _transfer(self, messages: list[tuple[int, int, ctypes.Array]]):
+        """
+        submit the provided messages as a single combined transaction
+
+        (the caller must keep the buffers alive until this call returns,
+        they are not referenced by the message structures)
+        """
+        if len(messages) > I2C_RDWR_IOCTL_MAX_MSGS:
+            raise ValueError(f"Unable to combine more than {I2C_RDWR_IOCTL_MAX_MSGS} messages!")
+        if self._fd is None:
+            raise RuntimeError(f"Device {self._device} was already closed!")
+        for idx, (address, flags, buf) in enumerate(messages):
+            msg = self._msgs[idx]
+            msg.addr  = address
+            msg.flags = flags
+            msg.len   = len(buf)
+            # store the plain address - a ctypes pointer to the buffer
+            # would keep the caller's buffer exported (and the caller
+            # would be unable to resize it) until the message is reused
+            msg.buf   = ctypes.cast(ctypes.addressof(buf), ctypes.POINTER(ctypes.c_uint8))
+        self._rdwr.nmsgs = len(messages)
+        fcntl.ioctl(self._fd, I2C_RDWR, self._rdwr)
+
+
+def _as_ctypes(buffer) -> ctypes.Array:
+    """
+    share the memory of a writable buffer with a ctypes array (no copy)
+    """
+    view = memoryview(buffer)
+    return (ctypes.c_uint8 * len(view)).from_buffer(view)
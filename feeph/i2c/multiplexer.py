@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+access devices behind an I²C multiplexer (e.g. TCA9548A)
+
+Each channel of the multiplexer is represented as its own I²C bus. The
+currently selected channel is remembered and the multiplexer is only
+reconfigured if a different channel is accessed.
+
+usage:
+```
+import busio
+import feeph.i2c
+
+i2c_bus = busio.I2C(...)
+mux = feeph.i2c.I2CMultiplexer(i2c_bus=i2c_bus, i2c_adr=0x70)
+
+with feeph.i2c.BurstHandler(i2c_bus=mux.channel(3), i2c_adr=0x4C) as bh:
+    value = bh.read_register(register)
+
+# read the same register from sensors on multiple channels
+# (operations are grouped by channel to minimize channel switches)
+jobs = [(channel, 0x4C, lambda bh: bh.read_register(0x00)) for channel in (0, 1, 0, 1)]
+values = mux.run_grouped(jobs)
+```
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Iterable
+
+# module busio provides no type hints
+import busio  # type: ignore
+from feeph.i2c.burst_handler import BurstHandle, BurstHandler
+
+LH = logging.getLogger("i2c")
+
+
+class I2CMultiplexer:
+    """
+    an I²C multiplexer with up to 8 channels
+
+    A channel is selected by writing a bitmask to the multiplexer's
+    state (bit 0 = channel 0, ...). The selected channel is tracked while
+    the lock on the parent bus is held. If the multiplexer was
+    reconfigured by someone else (e.g. it was reset) please call
+    `invalidate()`.
+    """
+
+    def __init__(self, i2c_bus: busio.I2C, i2c_adr: int = 0x70, channel_count: int = 8):
+        if not 0 <= i2c_adr <= 255:
+            raise ValueError(f"Provided I²C address {i2c_adr} is out of range! (allowed range: 0 ≤ x ≤ 255)")
+        if not isinstance(channel_count, int) or not 1 <= channel_count <= 8:
+            raise ValueError(f"Provided channel count {channel_count} is out of range! (allowed range: 1 ≤ x ≤ 8)")
+        self._i2c_bus = i2c_bus
+        self._i2c_adr = i2c_adr
+        self._channels = [MultiplexedI2C(multiplexer=self, channel=channel) for channel in range(channel_count)]
+        self._lock = threading.Lock()
+        self._selected: int | None = None
+        self.channel_switches = 0
+
+    @property
+    def selected(self) -> int | None:
+        """
+        the currently selected channel (None if unknown)
+        """
+        return self._selected
+
+    def channel(self, channel: int) -> "MultiplexedI2C":
+        """
+        return the I²C bus representing the provided channel
+        """
+        if not 0 <= channel < len(self._channels):
+            raise ValueError(f"Provided channel {channel} is out of range! (allowed range: 0 ≤ x < {len(self._channels)})")
+        return self._channels[channel]
+
+    def invalidate(self):
+        """
+        forget the currently selected channel
+        (the next access will reconfigure the multiplexer)
+        """
+        with self._lock:
+            self._selected = None
+
+    def run_grouped(self, jobs: Iterable[tuple[int, int, Callable[[BurstHandle], Any]]], timeout_ms: int | None = 500,
+                    priority: int = 0) -> list[Any]:
+        """
+        execute the provided jobs and return their results
+
+        Each job is a tuple of (channel, i2c_adr, callable). The callable
+        is executed within a burst on the device and its return value is
+        used as the job's result. Jobs are grouped by channel (starting
+        with the currently selected one) to minimize the number of
+        channel switches. The results are returned in the original order.
+        """
+        jobs = list(jobs)
+        for channel, _, _ in jobs:
+            self.channel(channel)  # validate channel
+        current = self._selected if self._selected is not None else 0
+        channel_count = len(self._channels)
+        # sorting is stable - the order within a channel is maintained
+        order = sorted(range(len(jobs)), key=lambda idx: (jobs[idx][0] - current) % channel_count)
+        results: list[Any] = [None] * len(jobs)
+        for idx in order:
+            channel, i2c_adr, func = jobs[idx]
+            i2c_bus = self._channels[channel]
+            with BurstHandler(i2c_bus=i2c_bus, i2c_adr=i2c_adr, timeout_ms=timeout_ms, priority=priority) as bh:
+                results[idx] = func(bh)
+        return results
+
+    def _select(self, channel: int):
+        """
+        select the provided channel (unless it's already selected)
+
+        (must be called while holding the lock on the parent bus)
+        """
+        with self._lock:
+            if self._selected == channel:
+                return
+            try:
+                self._i2c_bus.writeto(address=self._i2c_adr, buffer=bytearray([1 << channel]))
+            except (OSError, RuntimeError):
+                # the multiplexer's state is unknown
+                self._selected = None
+                raise
+            LH.debug("[%s] Switched multiplexer 0x%02X to channel %d.", __name__, self._i2c_adr, channel)
+            self._selected = channel
+            self.channel_switches += 1
+
+
+class MultiplexedI2C(busio.I2C):
+    """
+    a single channel of an I²C multiplexer (drop-in replacement for busio.I2C)
+
+    Locking this bus locks the parent bus. The channel is selected on
+    first access.
+
+    Please use `I2CMultiplexer.channel()` instead of instantiating this
+    class directly.
+    """
+
+    # We intentionally do not call super().init() because we don't want to
+    # call any of the hardware initialization code.
+    # pylint: disable=super-init-not-called
+    def __init__(self, multiplexer: I2CMultiplexer, channel: int):
+        self._multiplexer = multiplexer
+        self._channel = channel
+
+    def deinit(self):
+        pass
+
+    def try_lock(self) -> bool:
+        # pylint: disable=protected-access
+        return self._multiplexer._i2c_bus.try_lock()
+
+    def unlock(self):
+        # pylint: disable=protected-access
+        self._multiplexer._i2c_bus.unlock()
+
+    def _arbiter_key(self) -> busio.I2C:
+        """
+        return the bus to arbitrate on (see 'BurstHandler')
+
+        All channels share the lock on the parent bus, bursts on
+        different channels must therefore respect each other's priority.
+        """
+        # pylint: disable=protected-access
+        return self._multiplexer._i2c_bus
+
+    # replicate the signature of busio.I2C
+    # pylint: disable=too-many-arguments,protected-access,unused-argument
+    def readfrom_into(self, address: int, buffer: bytearray, *, start=0, end=None, stop=True):
+        self._multiplexer._select(self._channel)
+        # busio.I2C.readfrom_into() does not support 'stop'
+        self._multiplexer._i2c_bus.readfrom_into(address=address, buffer=buffer, start=start, end=end)
+
+    # replicate the signature of busio.I2C
+    # pylint: disable=too-many-arguments,protected-access
+    def writeto(self, address: int, buffer: bytearray, *, start=0, end=None):
+        self._multiplexer._select(self._channel)
+        self._multiplexer._i2c_bus.writeto(address=address, buffer=buffer, start=start, end=end)
+
+    # pylint: disable=protected-access
+    def writeto_then_readfrom(self, address: int, buffer_out: bytearray, buffer_in: bytearray, *,
+                              out_start=0, out_end=None, in_start=0, in_end=None, stop=False):
+        self._multiplexer._select(self._channel)
+        self._multiplexer._i2c_bus.writeto_then_readfrom(address=address, buffer_out=buffer_out, buffer_in=buffer_in,
+                                                         out_start=out_start, out_end=out_end,
+                                                         in_start=in_start, in_end=in_end, stop=stop)
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+poll registers at an adaptive rate and report changes
+
+Each watched register (or block of consecutive registers) is polled
+between a minimum and a maximum period. While its value remains unchanged
+(or within the deadband) the polling period is increased step by step up
+to the maximum period. As soon as a change is detected the polling period
+drops back to the minimum period.
+
+usage:
+```
+import feeph.i2c
+
+poller = feeph.i2c.AdaptivePoller(i2c_bus=i2c_bus)
+poller.watch(i2c_adr=0x4C, register=0x00, min_period_ms=10, max_period_ms=1000, callback=print)
+poller.watch(i2c_adr=0x4C, register=0x10, count=2, deadband=1)
+poller.start()
+
+# asyncio
+async for change in poller.changes():
+    print(change.i2c_adr, change.register, change.new_value)
+
+poller.stop()
+```
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, NamedTuple
+
+# module busio provides no type hints
+import busio  # type: ignore
+from feeph.i2c.background import BackgroundLoop
+from feeph.i2c.burst_handler import BurstHandler, _validate_priority, _validate_timeout
+
+LH = logging.getLogger("i2c")
+
+
+class RegisterChange(NamedTuple):
+    """
+    a detected change of a watched register
+
+    The values are integers for a single register and tuples of integers
+    for a block of registers. `old_value` is None for the initial read.
+    """
+    i2c_adr: int
+    register: int
+    old_value: Any
+    new_value: Any
+    timestamp_ns: int
+
+
+class WatchedRegister:
+    """
+    internal abstraction - !! do not instantiate !!
+
+    Please use `AdaptivePoller.watch()` instead.
+    """
+
+    # pylint: disable=too-many-arguments,too-many-instance-attributes
+    def __init__(self, i2c_adr: int, register: int, count: int, byte_count: int, min_period_ms: int, max_period_ms: int,
+                 deadband: int, callback: Callable[[RegisterChange], None] | None):
+        self.i2c_adr       = i2c_adr
+        self.register      = register
+        self.count         = count
+        self.byte_count    = byte_count
+        self.min_period_ns = min_period_ms * 1000 * 1000
+        self.max_period_ns = max_period_ms * 1000 * 1000
+        self.deadband      = deadband
+        self.callback      = callback
+        # polling state
+        self.value: Any = None
+        self.period_ns  = self.min_period_ns
+        self.due_ns     = 0
+
+    def is_changed(self, values: list[int]) -> bool:
+        if self.value is None:
+            return True
+        old_values = [self.value] if self.count == 1 else self.value
+        return any(abs(new - old) > self.deadband for new, old in zip(values, old_values))
+
+
+class AdaptivePoller(BackgroundLoop):
+    """
+    poll registers on a single I²C bus at an adaptive rate
+
+    `poll_once()` may be called manually (e.g. from an existing event loop)
+    or `start()` can be used to poll in a background thread.
+    """
+
+    def __init__(self, i2c_bus: busio.I2C, timeout_ms: int | None = 500, backoff_factor: float = 2.0, priority: int = 0):
+        super().__init__()
+        if backoff_factor < 1.0:
+            raise ValueError("Provided backoff factor must be ≥ 1.0!")
+        _validate_timeout(timeout_ms)
+        _validate_priority(priority)
+        self._i2c_bus = i2c_bus
+        self._timeout_ms = timeout_ms
+        self._backoff_factor = backoff_factor
+        self._priority = priority
+        self._lock = threading.Lock()
+        self._watched: list[WatchedRegister] = list()
+        self._subscribers: list[tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = list()
+
+    # pylint: disable=too-many-arguments
+    def watch(self, i2c_adr: int, register: int, count: int = 1, byte_count: int = 1, min_period_ms: int = 10,
+              max_period_ms: int = 1000, deadband: int = 0,
+              callback: Callable[[RegisterChange], None] | None = None) -> WatchedRegister:
+        """
+        start polling a register (or a block of `count` registers)
+
+        - changes smaller or equal than `deadband` are ignored
+        - `callback` is called for every detected change (including the
+          initial read)
+        """
+        if not 0 <= i2c_adr <= 255:
+            raise ValueError(f"Provided I²C address {i2c_adr} is out of range! (allowed range: 0 ≤ x ≤ 255)")
+        if not isinstance(count, int) or count < 1:
+            raise ValueError("Provided register count is not a positive integer!")
+        if not isinstance(byte_count, int) or byte_count < 1:
+            raise ValueError("Provided byte count is not a positive integer!")
+        if not 0 <= register <= 255 or not 0 <= register + count - 1 <= 255:
+            raise ValueError(f"Provided I²C device register {register} is out of range! (allowed range: 0 ≤ x ≤ 255)")
+        if not isinstance(min_period_ms, int) or not isinstance(max_period_ms, int) or not 0 < min_period_ms <= max_period_ms:
+            raise ValueError("Provided polling periods must be positive integers with min_period_ms ≤ max_period_ms!")
+        if deadband < 0:
+            raise ValueError("Provided deadband must not be negative!")
+        watched = WatchedRegister(i2c_adr=i2c_adr, register=register, count=count, byte_count=byte_count,
+                                  min_period_ms=min_period_ms, max_period_ms=max_period_ms,
+                                  deadband=deadband, callback=callback)
+        with self._lock:
+            self._watched.append(watched)
+        self._wakeup.set()
+        return watched
+
+    def unwatch(self, watched: WatchedRegister):
+        """
+        stop polling a register
+        """
+        with self._lock:
+            self._watched.remove(watched)
+
+    def next_due_ns(self) -> int | None:
+        """
+        return the point in time (time.monotonic_ns()) when the next
+        register is due or None if no registers are watched
+        """
+        with self._lock:
+            if not self._watched:
+                return None
+            return min(watched.due_ns for watched in self._watched)
+
+    def poll_once(self, now_ns: int | None = None) -> int:
+        """
+        read all registers which are due and return the number of reads
+
+        Registers on the same device are read in a single burst.
+        """
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+        by_device: dict[int, list[WatchedRegister]] = {}
+        with self._lock:
+            for watched in self._watched:
+                if watched.due_ns <= now_ns:
+                    by_device.setdefault(watched.i2c_adr, []).append(watched)
+        reads = 0
+        for i2c_adr, due in by_device.items():
+            results = list()
+            try:
+                bhr = BurstHandler(i2c_bus=self._i2c_bus, i2c_adr=i2c_adr,
+                                   timeout_ms=self._timeout_ms, priority=self._priority)
+                with bhr as bh:
+                    for watched in due:
+                        registers = range(watched.register, watched.register + watched.count)
+                        values = bh.read_registers(registers, byte_count=watched.byte_count)
+                        results.append((watched, values))
+            except RuntimeError as e:
+                LH.warning("[%s] Unable to poll device 0x%02X: %s", __name__, i2c_adr, e)
+            polled = {id(watched) for watched, _ in results}
+            for watched in due:
+                if id(watched) not in polled:
+                    # try again as soon as possible
+                    watched.due_ns = now_ns + watched.min_period_ns
+            for watched, values in results:
+                self._update(watched, values, now_ns)
+                reads += watched.count
+        return reads
+
+    def _update(self, watched: WatchedRegister, values: list[int], now_ns: int):
+        if watched.is_changed(values):
+            new_value = values[0] if watched.count == 1 else tuple(values)
+            change = RegisterChange(i2c_adr=watched.i2c_adr, register=watched.register,
+                                    old_value=watched.value, new_value=new_value, timestamp_ns=now_ns)
+            watched.value = new_value
+            watched.period_ns = watched.min_period_ns
+            self._notify(watched, change)
+        else:
+            watched.period_ns = min(int(watched.period_ns * self._backoff_factor), watched.max_period_ns)
+        watched.due_ns = now_ns + watched.period_ns
+
+    def _notify(self, watched: WatchedRegister, change: RegisterChange):
+        if watched.callback is not None:
+            try:
+                watched.callback(change)
+            # a misbehaving callback must not stop the poller
+            # pylint: disable=broad-exception-caught
+            except Exception as e:
+                LH.warning("[%s] Callback for register 0x%02X failed: %s", __name__, watched.register, e)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, change)
+
+    async def changes(self) -> AsyncIterator[RegisterChange]:
+        """
+        iterate over all detected changes (asyncio)
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        subscriber = (loop, queue)
+        with self._lock:
+            self._subscribers.append(subscriber)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            with self._lock:
+                self._subscribers.remove(subscriber)
+
+    # ---------------------------------------------------------------------
+
+    def _run_once(self) -> float | None:
+        self.poll_once()
+        next_due_ns = self.next_due_ns()
+        if next_due_ns is None:
+            return None
+        return (next_due_ns - time.monotonic_ns()) / 1_000_000_000
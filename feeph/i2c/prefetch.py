@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+keep frequently used registers refreshed in the background
+
+Consumers read the most recent values from a snapshot instead of
+accessing the I²C bus themselves. Reading a snapshot never blocks and
+does not depend on contention on the I²C bus.
+
+usage:
+```
+import feeph.i2c
+
+prefetcher = feeph.i2c.Prefetcher(i2c_bus=i2c_bus, interval_ms=100)
+prefetcher.add(i2c_adr=0x4C, register=0x00)
+prefetcher.add(i2c_adr=0x4C, register=0x10, count=4)
+prefetcher.start()
+
+# raises a RuntimeError if the value is older than 500 ms
+value = prefetcher.get(i2c_adr=0x4C, register=0x10, max_age_ms=500)
+
+# multiple values from the same refresh cycle
+snapshot = prefetcher.snapshot()
+values = [snapshot.get(0x4C, register) for register in (0x10, 0x11)]
+
+prefetcher.stop()
+```
+"""
+
+import logging
+import threading
+import time
+import types
+from typing import Mapping
+
+# module busio provides no type hints
+import busio  # type: ignore
+from feeph.i2c.background import BackgroundLoop
+from feeph.i2c.burst_handler import BurstHandler, _validate_chunk_size, _validate_priority, _validate_timeout
+
+LH = logging.getLogger("i2c")
+
+
+class Snapshot:
+    """
+    an immutable set of register values
+
+    Each value has its own timestamp (time.monotonic_ns()) since values
+    which could not be refreshed are carried over from the previous
+    snapshot.
+    """
+
+    def __init__(self, version: int, timestamp_ns: int, values: Mapping[tuple[int, int], tuple[int, int]]):
+        self.version = version
+        self.timestamp_ns = timestamp_ns
+        self._values = values
+
+    def __contains__(self, key: tuple[int, int]) -> bool:
+        return key in self._values
+
+    def get(self, i2c_adr: int, register: int, max_age_ms: int | None = None) -> int:
+        """
+        return the value of the provided register
+        - may raise a RuntimeError if there is no value (yet)
+        - may raise a RuntimeError if the value is older than `max_age_ms`
+        """
+        entry = self._values.get((i2c_adr, register))
+        if entry is None:
+            raise RuntimeError(f"No value available for register 0x{register:02X} on device 0x{i2c_adr:02X}.")
+        value, timestamp_ns = entry
+        if max_age_ms is not None:
+            age_ns = time.monotonic_ns() - timestamp_ns
+            if age_ns > max_age_ms * 1000 * 1000:
+                raise RuntimeError(f"Value for register 0x{register:02X} on device 0x{i2c_adr:02X} is stale. "
+                                   f"({age_ns // (1000 * 1000)} ms > {max_age_ms} ms)")
+        return value
+
+    def get_timestamp_ns(self, i2c_adr: int, register: int) -> int:
+        """
+        return the time the provided register was read (time.monotonic_ns())
+        """
+        entry = self._values.get((i2c_adr, register))
+        if entry is None:
+            raise RuntimeError(f"No value available for register 0x{register:02X} on device 0x{i2c_adr:02X}.")
+        return entry[1]
+
+
+class _PrefetchEntry:
+    """
+    internal abstraction - !! do not instantiate !!
+    """
+
+    def __init__(self, i2c_adr: int, register: int, count: int, byte_count: int):
+        self.i2c_adr = i2c_adr
+        self.byte_count = byte_count
+        # multi-byte values occupy 'byte_count' consecutive registers
+        self.registers = [register + idx * byte_count for idx in range(count)]
+
+
+class Prefetcher(BackgroundLoop):
+    """
+    refresh a declared set of registers in the background
+
+    The values are published as double-buffered snapshots: the next
+    snapshot (back buffer) is assembled while readers keep using the
+    current one (front buffer). Once complete it replaces the current
+    snapshot in a single reference assignment, i.e. readers never need
+    a lock and never observe a partially updated snapshot.
+    """
+
+    def __init__(self, i2c_bus: busio.I2C, interval_ms: int = 100, timeout_ms: int | None = 500, priority: int = 0,
+                 chunk_size: int | None = None):
+        super().__init__()
+        if not isinstance(interval_ms, int) or interval_ms <= 0:
+            raise ValueError("Provided interval is not a positive integer!")
+        _validate_timeout(timeout_ms)
+        _validate_priority(priority)
+        _validate_chunk_size(chunk_size)
+        self._i2c_bus = i2c_bus
+        self._interval_s = interval_ms / 1000
+        self._timeout_ms = timeout_ms
+        self._priority = priority
+        self._chunk_size = chunk_size
+        self._lock = threading.Lock()
+        # serializes writers, readers never need a lock
+        self._refresh_lock = threading.Lock()
+        self._entries: list[_PrefetchEntry] = list()
+        self._front = Snapshot(version=0, timestamp_ns=0, values=types.MappingProxyType({}))
+
+    def add(self, i2c_adr: int, register: int, count: int = 1, byte_count: int = 1):
+        """
+        declare a register (or a block of `count` values) to be refreshed
+
+        Multi-byte values are expected to occupy `byte_count` consecutive
+        registers, i.e. a block covers `count * byte_count` registers.
+        """
+        if not 0 <= i2c_adr <= 255:
+            raise ValueError(f"Provided I²C address {i2c_adr} is out of range! (allowed range: 0 ≤ x ≤ 255)")
+        if not isinstance(count, int) or count < 1:
+            raise ValueError("Provided register count is not a positive integer!")
+        if not isinstance(byte_count, int) or byte_count < 1:
+            raise ValueError("Provided byte count is not a positive integer!")
+        if not 0 <= register <= 255 or not 0 <= register + count * byte_count - 1 <= 255:
+            raise ValueError(f"Provided I²C device register {register} is out of range! (allowed range: 0 ≤ x ≤ 255)")
+        with self._lock:
+            self._entries.append(_PrefetchEntry(i2c_adr=i2c_adr, register=register, count=count, byte_count=byte_count))
+        self._wakeup.set()
+
+    def snapshot(self) -> Snapshot:
+        """
+        return the most recent snapshot (never blocks)
+        """
+        return self._front
+
+    def get(self, i2c_adr: int, register: int, max_age_ms: int | None = None) -> int:
+        """
+        return the most recent value of the provided register
+        - may raise a RuntimeError if there is no value (yet)
+        - may raise a RuntimeError if the value is older than `max_age_ms`
+        """
+        return self._front.get(i2c_adr, register, max_age_ms=max_age_ms)
+
+    def refresh(self) -> Snapshot:
+        """
+        read all declared registers, publish and return a new snapshot
+
+        All registers of the same device are read in a single burst.
+        Values which could not be read are carried over from the
+        previous snapshot (with their original timestamp). Concurrent
+        calls are serialized, each call publishes its own version.
+        """
+        with self._refresh_lock:
+            with self._lock:
+                entries = list(self._entries)
+            by_device: dict[int, list[_PrefetchEntry]] = {}
+            for entry in entries:
+                by_device.setdefault(entry.i2c_adr, []).append(entry)
+            front = self._front
+            # pylint: disable=protected-access
+            back: dict[tuple[int, int], tuple[int, int]] = dict(front._values)
+            for i2c_adr, device_entries in by_device.items():
+                try:
+                    bhr = BurstHandler(i2c_bus=self._i2c_bus, i2c_adr=i2c_adr,
+                                       timeout_ms=self._timeout_ms, priority=self._priority)
+                    with bhr as bh:
+                        for entry in device_entries:
+                            values = bh.read_registers(entry.registers, byte_count=entry.byte_count,
+                                                       chunk_size=self._chunk_size)
+                            timestamp_ns = time.monotonic_ns()
+                            for register, value in zip(entry.registers, values):
+                                back[(i2c_adr, register)] = (value, timestamp_ns)
+                except RuntimeError as e:
+                    LH.warning("[%s] Unable to refresh device 0x%02X: %s", __name__, i2c_adr, e)
+            snapshot = Snapshot(version=front.version + 1, timestamp_ns=time.monotonic_ns(),
+                                values=types.MappingProxyType(back))
+            # publish the new snapshot (single reference assignment)
+            self._front = snapshot
+            return snapshot
+
+    # ---------------------------------------------------------------------
+
+    def _run_once(self) -> float | None:
+        started = time.monotonic()
+        self.refresh()
+        return self._interval_s - (time.monotonic() - started)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+remember which devices are present on an I²C bus
+
+usage:
+```
+import feeph.i2c
+
+presence_cache = feeph.i2c.PresenceCache(ttl_ms=60_000)
+feeph.i2c.scan(i2c_bus=i2c_bus, presence_cache=presence_cache)
+
+# fails immediately if the device did not respond during the scan
+with feeph.i2c.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x4C, presence_cache=presence_cache) as bh:
+    ...
+```
+"""
+
+import threading
+import time
+import weakref
+
+# module busio provides no type hints
+import busio  # type: ignore
+
+
+class PresenceCache:
+    """
+    cache the presence of I²C devices for a limited amount of time
+
+    The cache is thread-safe and can be shared between multiple buses.
+    """
+
+    def __init__(self, ttl_ms: int = 60_000):
+        if isinstance(ttl_ms, int) and ttl_ms > 0:
+            self._ttl_ns = ttl_ms * 1000 * 1000
+        else:
+            raise ValueError("Provided TTL is not a positive integer!")
+        self._lock = threading.Lock()
+        # i2c_bus -> {i2c_adr: (is_present, expires_ns)}
+        self._entries: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def get(self, i2c_bus: busio.I2C, i2c_adr: int) -> bool | None:
+        """
+        return True/False if the device is known to be present/absent
+        or None if it's unknown (or the cached result expired)
+        """
+        with self._lock:
+            entry = self._entries.get(i2c_bus, {}).get(i2c_adr)
+        if entry is None:
+            return None
+        is_present, expires_ns = entry
+        if time.monotonic_ns() > expires_ns:
+            return None
+        return is_present
+
+    def set(self, i2c_bus: busio.I2C, i2c_adr: int, is_present: bool):
+        """
+        record the presence of a device
+        """
+        expires_ns = time.monotonic_ns() + self._ttl_ns
+        with self._lock:
+            self._entries.setdefault(i2c_bus, {})[i2c_adr] = (is_present, expires_ns)
+
+    def invalidate(self, i2c_bus: busio.I2C | None = None, i2c_adr: int | None = None):
+        """
+        forget cached results
+        - for all buses (no arguments)
+        - for a single bus (`i2c_bus`)
+        - for a single device (`i2c_bus` and `i2c_adr`)
+        """
+        with self._lock:
+            if i2c_bus is None:
+                self._entries.clear()
+            elif i2c_adr is None:
+                self._entries.pop(i2c_bus, None)
+            else:
+                self._entries.get(i2c_bus, {}).pop(i2c_adr, None)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+find devices on one or more I²C buses
+
+Each address is probed exactly once (no retries) by reading a single byte.
+The bus lock is acquired once per bus and yielded between chunks of
+addresses if more important bursts are waiting.
+
+usage:
+```
+import feeph.i2c
+
+addresses = feeph.i2c.scan(i2c_bus=i2c_bus)
+
+# scan multiple buses concurrently
+results = feeph.i2c.scan_buses([i2c_bus1, i2c_bus2])
+addresses1 = results[i2c_bus1]
+```
+"""
+
+import concurrent.futures
+import logging
+from typing import Iterable
+
+# module busio provides no type hints
+import busio  # type: ignore
+from feeph.i2c.burst_handler import BurstHandler
+from feeph.i2c.presence import PresenceCache
+
+LH = logging.getLogger("i2c")
+
+# 0x00-0x07 and 0x78-0x7F are reserved
+DEFAULT_ADDRESSES = range(0x08, 0x78)
+
+
+def scan(i2c_bus: busio.I2C, addresses: Iterable[int] = DEFAULT_ADDRESSES, timeout_ms: int | None = 500,
+         presence_cache: PresenceCache | None = None, refresh: bool = False, chunk_size: int = 8,
+         priority: int = 0) -> list[int]:
+    """
+    probe the provided addresses and return the ones that responded
+
+    - each address is probed with a single attempt, there are no retries
+    - `timeout_ms` limits the time to acquire the lock on the I²C bus
+    - results are recorded in `presence_cache` (if provided), addresses
+      with a cached result are not probed again unless `refresh` is set
+    - the lock may be yielded every `chunk_size` addresses
+    - may raise a RuntimeError if it was not possible to acquire
+        the bus within allowed time
+    """
+    if not isinstance(chunk_size, int) or chunk_size < 1:
+        raise ValueError("Provided chunk size is not a positive integer!")
+    found = list()
+    pending = list()
+    for i2c_adr in addresses:
+        if not 0 <= i2c_adr <= 255:
+            raise ValueError(f"Provided I²C address {i2c_adr} is out of range! (allowed range: 0 ≤ x ≤ 255)")
+        cached = presence_cache.get(i2c_bus, i2c_adr) if presence_cache is not None and not refresh else None
+        if cached is None:
+            pending.append(i2c_adr)
+        elif cached:
+            found.append(i2c_adr)
+    if pending:
+        # the device address is irrelevant, we are only using the lock
+        with BurstHandler(i2c_bus=i2c_bus, i2c_adr=pending[0], timeout_ms=timeout_ms, priority=priority) as bh:
+            for idx, i2c_adr in enumerate(pending):
+                if idx > 0 and idx % chunk_size == 0:
+                    bh.checkpoint()
+                is_present = _probe(i2c_bus, i2c_adr)
+                if presence_cache is not None:
+                    presence_cache.set(i2c_bus, i2c_adr, is_present)
+                if is_present:
+                    found.append(i2c_adr)
+    return sorted(found)
+
+
+def scan_buses(i2c_buses: list[busio.I2C], **kwargs) -> dict[busio.I2C, list[int]]:
+    """
+    scan multiple I²C buses concurrently (one thread per bus)
+
+    All keyword arguments are passed on to `scan()`.
+    """
+    if not i2c_buses:
+        return {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(i2c_buses)) as executor:
+        futures = {i2c_bus: executor.submit(scan, i2c_bus, **kwargs) for i2c_bus in i2c_buses}
+        return {i2c_bus: future.result() for i2c_bus, future in futures.items()}
+
+
+def _probe(i2c_bus: busio.I2C, i2c_adr: int) -> bool:
+    """
+    check if a device acknowledges its address
+    """
+    try:
+        i2c_bus.readfrom_into(address=i2c_adr, buffer=bytearray(1))
+        return True
+    except (OSError, RuntimeError) as e:
+        # [Errno 121] Remote I/O error
+        LH.debug("[%s] No response from address 0x%02X: %s", __name__, i2c_adr, e)
+        return False
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+perform background thread related tests
+"""
+
+import threading
+import time
+import unittest
+from unittest import mock
+
+import feeph.i2c.background as sut  # sytem under test
+
+
+class Counter(sut.BackgroundLoop):
+
+    def __init__(self, fail_first: bool = False):
+        super().__init__()
+        self.calls = 0
+        self.called = threading.Event()
+        self._fail_first = fail_first
+
+    def _run_once(self) -> float | None:
+        self.calls += 1
+        if self._fail_first and self.calls == 1:
+            raise ValueError("unexpected error")
+        self.called.set()
+        # wait until woken up
+        return None
+
+
+# pylint: disable=protected-access
+class TestBackgroundLoop(unittest.TestCase):
+
+    def test_stop(self):
+        loop = Counter()
+        # -----------------------------------------------------------------
+        loop.start()
+        computed = loop.called.wait(timeout=1)
+        loop.stop()
+        # -----------------------------------------------------------------
+        self.assertTrue(computed)
+        self.assertIsNone(loop._thread)
+
+    def test_stop_during_run(self):
+        loop = Counter()
+        # the loop is about to call '_run_once()' while being stopped
+        clear = loop._wakeup.clear
+
+        def delayed_clear():
+            time.sleep(0.05)
+            clear()
+
+        loop._wakeup.clear = delayed_clear  # type: ignore[method-assign]
+        # -----------------------------------------------------------------
+        loop.start()
+        time.sleep(0.01)
+        started = time.monotonic()
+        loop.stop()
+        elapsed = time.monotonic() - started
+        # -----------------------------------------------------------------
+        self.assertLess(elapsed, 1.0)
+
+    def test_unexpected_error(self):
+        loop = Counter(fail_first=True)
+        # -----------------------------------------------------------------
+        with mock.patch.object(sut, "_MAX_WAIT_S", 0.01), self.assertLogs("i2c", level="ERROR"):
+            loop.start()
+            computed = loop.called.wait(timeout=2)
+        loop.stop()
+        # -----------------------------------------------------------------
+        self.assertTrue(computed)
+        self.assertEqual(loop.calls, 2)
+
+    def test_not_implemented(self):
+        # -----------------------------------------------------------------
+        # -----------------------------------------------------------------
+        # '_run_once()' is an abstract method
+        self.assertRaises(TypeError, sut.BackgroundLoop)
+
+    def test_start_twice(self):
+        loop = Counter()
+        # -----------------------------------------------------------------
+        loop.start()
+        self.assertRaises(RuntimeError, loop.start)
+        loop.stop()
+        # -----------------------------------------------------------------
+        self.assertIsNone(loop._thread)
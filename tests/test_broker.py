@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+perform I²C bus broker related tests
+"""
+
+import os
+import socket
+import tempfile
+import time
+import unittest
+
+import feeph.i2c as sut  # sytem under test
+
+
+# pylint: disable=protected-access
+class TestBusBroker(unittest.TestCase):
+
+    def setUp(self):
+        self.state = {
+            0x4C: {
+                0x00: 0x12,
+                0x01: 0x34,
+            },
+            0x70: {-1: 0x00},
+        }
+        self.i2c_bus = sut.EmulatedI2C(state=self.state)
+        self.tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.socket_path = os.path.join(self.tmpdir.name, "i2c.sock")
+        self.broker = sut.BusBroker(i2c_bus=self.i2c_bus, socket_path=self.socket_path, session_timeout_ms=200)
+        self.broker.start()
+        self.clients = list()
+
+    def tearDown(self):
+        for client in self.clients:
+            client.deinit()
+        self.broker.stop()
+        self.tmpdir.cleanup()
+
+    def _connect(self) -> sut.BrokeredI2C:
+        client = sut.BrokeredI2C(socket_path=self.socket_path)
+        self.clients.append(client)
+        return client
+
+    def test_burst_handler(self):
+        i2c_bus = self._connect()
+        # -----------------------------------------------------------------
+        with sut.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x4C) as bh:
+            computed = bh.read_register(0x00)
+            bh.write_register(0x01, 0x56)
+        expected = 0x12
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, expected)
+        self.assertEqual(self.broker._i2c_bus._state[0x4C], {0x00: 0x12, 0x01: 0x56})
+
+    def test_burst_handler_state(self):
+        i2c_bus = self._connect()
+        # -----------------------------------------------------------------
+        with sut.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x70) as bh:
+            bh.set_state(0x04)
+            computed = bh.get_state()
+        expected = 0x04
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, expected)
+
+    def test_pipelined_requests(self):
+        i2c_bus = self._connect()
+        # -----------------------------------------------------------------
+        future1 = i2c_bus.submit([("write_read", 0x4C, b"\x00", 1), ("write_read", 0x4C, b"\x01", 1)])
+        future2 = i2c_bus.submit([("write", 0x4C, b"\x01\x56"), ("write_read", 0x4C, b"\x01", 1)])
+        computed = [future1.result(timeout=1), future2.result(timeout=1)]
+        expected = [[b"\x12", b"\x34"], [None, b"\x56"]]
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, expected)
+
+    def test_remote_error(self):
+        i2c_bus = self._connect()
+        # -----------------------------------------------------------------
+        future = i2c_bus.submit([("write_read", 0x4C, b"\xFF", 1)])
+        # -----------------------------------------------------------------
+        self.assertRaises(RuntimeError, future.result, timeout=1)
+
+    def test_unsupported_operation(self):
+        i2c_bus = self._connect()
+        # -----------------------------------------------------------------
+        # -----------------------------------------------------------------
+        self.assertRaises(ValueError, i2c_bus.submit, [("explode", 0x4C)])
+
+    def test_session_is_exclusive(self):
+        client1 = self._connect()
+        client2 = self._connect()
+        # -----------------------------------------------------------------
+        while not client1.try_lock():
+            time.sleep(0.001)
+        self.assertFalse(client1.try_lock())
+        future = client2.submit([("write_read", 0x4C, b"\x00", 1)])
+        time.sleep(0.05)
+        blocked = future.done()
+        client1.unlock()
+        computed = future.result(timeout=1)
+        # -----------------------------------------------------------------
+        self.assertFalse(blocked)
+        self.assertEqual(computed, [b"\x12"])
+
+    def test_session_timeout(self):
+        client1 = self._connect()
+        client2 = self._connect()
+        # -----------------------------------------------------------------
+        while not client1.try_lock():
+            time.sleep(0.001)
+        # client1 never releases the lock, the broker will release it
+        # after the session timed out (200 ms)
+        future = client2.submit([("write_read", 0x4C, b"\x00", 1)])
+        computed = future.result(timeout=2)
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, [b"\x12"])
+
+    def test_session_expired(self):
+        client1 = self._connect()
+        client2 = self._connect()
+        # -----------------------------------------------------------------
+        with sut.BurstHandler(i2c_bus=client1, i2c_adr=0x4C) as bh:
+            bh.read_register(0x00)
+            # the broker releases the session after 200 ms
+            client2.submit([("write_read", 0x4C, b"\x00", 1)]).result(timeout=2)
+            # the remaining burst must not be executed without the session
+            self.assertRaises(RuntimeError, bh.write_register, 0x01, 0x56, max_tries=1)
+        # -----------------------------------------------------------------
+        self.assertEqual(self.broker._i2c_bus._state[0x4C][0x01], 0x34)
+
+    def test_round_robin(self):
+        client1 = self._connect()
+        client2 = self._connect()
+        blocker = self._connect()
+        # record the order in which the broker accesses the registers
+        # (client1 reads register 0x00, client2 reads register 0x01)
+        order = list()
+        writeto_then_readfrom = self.i2c_bus.writeto_then_readfrom
+
+        def recorder(address, buffer_out, buffer_in, **kwargs):
+            order.append(buffer_out[0])
+            writeto_then_readfrom(address, buffer_out, buffer_in, **kwargs)
+
+        self.i2c_bus.writeto_then_readfrom = recorder
+        # -----------------------------------------------------------------
+        # hold the bus so that all requests are queued by the broker
+        while not blocker.try_lock():
+            time.sleep(0.001)
+        futures = list()
+        for _ in range(3):
+            futures.append(client1.submit([("write_read", 0x4C, b"\x00", 1)]))
+        for _ in range(3):
+            futures.append(client2.submit([("write_read", 0x4C, b"\x01", 1)]))
+        time.sleep(0.05)
+        blocker.unlock()
+        for future in futures:
+            future.result(timeout=1)
+        # -----------------------------------------------------------------
+        # the broker alternates between the clients
+        self.assertIn(order, ([0x00, 0x01] * 3, [0x01, 0x00] * 3))
+
+    def test_client_disconnect_releases_session(self):
+        client1 = sut.BrokeredI2C(socket_path=self.socket_path)
+        client2 = self._connect()
+        # -----------------------------------------------------------------
+        while not client1.try_lock():
+            time.sleep(0.001)
+        client1.deinit()
+        computed = client2.submit([("write_read", 0x4C, b"\x00", 1)]).result(timeout=1)
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, [b"\x12"])
+
+    def test_request_timeout(self):
+        client1 = self._connect()
+        client2 = sut.BrokeredI2C(socket_path=self.socket_path, timeout_ms=20)
+        self.clients.append(client2)
+        # -----------------------------------------------------------------
+        while not client1.try_lock():
+            time.sleep(0.001)
+        # -----------------------------------------------------------------
+        self.assertRaises(RuntimeError, client2.readfrom_into, 0x4C, bytearray(1))
+        client1.unlock()
+
+    def test_abandoned_lock_request(self):
+        client1 = self._connect()
+        client2 = self._connect()
+        client3 = self._connect()
+        # -----------------------------------------------------------------
+        while not client1.try_lock():
+            time.sleep(0.001)
+        # client2 gives up while client1 is holding the lock
+        with self.assertRaises(RuntimeError):
+            with sut.BurstHandler(i2c_bus=client2, i2c_adr=0x4C, timeout_ms=20):
+                pass
+        client1.unlock()
+        # client2's lock request must not block client3
+        # (the session timeout is 200 ms)
+        future = client3.submit([("write_read", 0x4C, b"\x00", 1)])
+        computed = future.result(timeout=0.1)
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, [b"\x12"])
+
+    def test_malformed_request(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.socket_path)
+        i2c_bus = self._connect()
+        # -----------------------------------------------------------------
+        try:
+            responses = list()
+            for message in ([1, 2, 3], {"id": 1}, {"id": 2, "type": "burst"}):
+                sut.broker._send_message(sock, message)
+                responses.append(sut.broker._recv_message(sock))
+        finally:
+            sock.close()
+        # the broker keeps serving its clients
+        computed = i2c_bus.submit([("write_read", 0x4C, b"\x00", 1)]).result(timeout=1)
+        # -----------------------------------------------------------------
+        self.assertEqual([response["id"] for response in responses], [None, 1, 2])
+        self.assertTrue(all(response["error"] is not None for response in responses))
+        self.assertEqual(computed, [b"\x12"])
+
+    def test_invalid_session_timeout(self):
+        # -----------------------------------------------------------------
+        # -----------------------------------------------------------------
+        self.assertRaises(ValueError, sut.BusBroker, i2c_bus=self.i2c_bus, socket_path=self.socket_path, session_timeout_ms=0)
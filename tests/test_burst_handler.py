@@ -3,6 +3,8 @@
 perform I²C bus related tests
 """
 
+import threading
+import time
 import unittest
 
 import feeph.i2c as sut  # sytem under test
@@ -180,6 +182,150 @@ class TestBurstHandler(unittest.TestCase):
         self.assertEqual(computed_r, expected_r)
         self.assertEqual(computed_w, expected_w)
 
+    def test_read_device_registers_bulk(self):
+        state = {
+            0x4C: {
+                0x01: 0x12,
+                0x10: 0x23,
+            },
+        }
+        i2c_bus = sut.EmulatedI2C(state=state)
+        # -----------------------------------------------------------------
+        with sut.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x4C) as bh:
+            computed = bh.read_registers([0x01, 0x10, 0x01], chunk_size=2)
+        expected = [0x12, 0x23, 0x12]
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, expected)
+
+    def test_write_device_registers_bulk(self):
+        state = {
+            0x4C: {
+                0x01: 0x00,
+                0x10: 0x00,
+            },
+        }
+        i2c_bus = sut.EmulatedI2C(state=state)
+        # -----------------------------------------------------------------
+        with sut.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x4C) as bh:
+            bh.write_registers({0x01: 0x12, 0x10: 0x34}.items(), chunk_size=1)
+        computed = i2c_bus._state[0x4C]
+        expected = {0x01: 0x12, 0x10: 0x34}
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, expected)
+
+    def test_invalid_chunk_size(self):
+        i2c_bus = sut.EmulatedI2C(state={0x4C: {0x00: 0x00}})
+        # -----------------------------------------------------------------
+        # -----------------------------------------------------------------
+        with sut.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x4C) as bh:
+            self.assertRaises(ValueError, bh.read_registers, [0x00], chunk_size=0)
+
+    # ---------------------------------------------------------------------
+
+    def test_checkpoint_without_waiters(self):
+        i2c_bus = sut.EmulatedI2C(state={0x4C: {0x00: 0x12}})
+        # -----------------------------------------------------------------
+        bhr = sut.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x4C)
+        with bhr as bh:
+            computed = bh.checkpoint()
+        # -----------------------------------------------------------------
+        self.assertFalse(computed)
+        self.assertEqual(bhr.statistics.acquisitions, 1)
+        self.assertEqual(bhr.statistics.yields, 0)
+
+    def test_checkpoint_higher_priority_waiter(self):
+        i2c_bus = sut.EmulatedI2C(state={0x4C: {0x00: 0x12}})
+        arbiter = sut.burst_handler._get_arbiter(i2c_bus)
+        # -----------------------------------------------------------------
+        bhr = sut.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x4C)
+        with bhr as bh:
+            # simulate a burst with a higher priority waiting for the bus
+            # (it gives up after 20 ms)
+            ticket = arbiter.register(priority=5)
+            timer = threading.Timer(0.02, arbiter.unregister, args=[ticket])
+            timer.start()
+            computed = bh.read_registers([0x00] * 3, chunk_size=1)
+        expected = [0x12] * 3
+        # -----------------------------------------------------------------
+        timer.join()
+        self.assertEqual(computed, expected)
+        self.assertEqual(bhr.statistics.acquisitions, 2)
+        self.assertEqual(bhr.statistics.yields, 1)
+
+    def test_checkpoint_lower_priority_waiter(self):
+        i2c_bus = sut.EmulatedI2C(state={0x4C: {0x00: 0x12}})
+        arbiter = sut.burst_handler._get_arbiter(i2c_bus)
+        ticket = arbiter.register(priority=-5)
+        # -----------------------------------------------------------------
+        bhr = sut.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x4C)
+        with bhr as bh:
+            bh.read_registers([0x00] * 3, chunk_size=1)
+        # -----------------------------------------------------------------
+        arbiter.unregister(ticket)
+        self.assertEqual(bhr.statistics.yields, 0)
+
+    def test_hold_time_budget_exceeded(self):
+        i2c_bus = sut.EmulatedI2C(state={0x4C: {0x00: 0x12}})
+        # -----------------------------------------------------------------
+        bhr = sut.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x4C, max_hold_ms=1)
+        with bhr as bh:
+            bh.read_register(0x00)
+            time.sleep(0.005)
+        # -----------------------------------------------------------------
+        self.assertEqual(bhr.statistics.budget_exceeded, 1)
+        self.assertGreater(bhr.statistics.max_hold_ns, 1000 * 1000)
+
+    def test_hold_time_budget_yields_to_equal_priority(self):
+        i2c_bus = sut.EmulatedI2C(state={0x4C: {0x00: 0x12}})
+        arbiter = sut.burst_handler._get_arbiter(i2c_bus)
+        # -----------------------------------------------------------------
+        bhr = sut.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x4C, max_hold_ms=1)
+        with bhr as bh:
+            ticket = arbiter.register(priority=0)
+            timer = threading.Timer(0.02, arbiter.unregister, args=[ticket])
+            timer.start()
+            time.sleep(0.005)
+            computed = bh.checkpoint()
+        # -----------------------------------------------------------------
+        timer.join()
+        self.assertTrue(computed)
+        self.assertEqual(bhr.statistics.budget_exceeded, 1)
+
+    def test_hold_time_budget_no_livelock(self):
+        """
+        bursts with the same priority yielding to each other must not
+        defer to each other forever
+        """
+        class LockingI2C(sut.EmulatedI2C):
+            def __init__(self, state):
+                super().__init__(state=state)
+                self._real_lock = threading.Lock()
+
+            def try_lock(self) -> bool:
+                return self._real_lock.acquire(blocking=False)
+
+            def unlock(self):
+                self._real_lock.release()
+
+        i2c_bus = LockingI2C(state={0x4C: {0x00: 0x12}})
+        completed = list()
+
+        def burst(idx: int):
+            with sut.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x4C, timeout_ms=2000, max_hold_ms=1) as bh:
+                for _ in range(5):
+                    time.sleep(0.002)
+                    bh.checkpoint()
+            completed.append(idx)
+
+        threads = [threading.Thread(target=burst, args=[idx]) for idx in range(3)]
+        # -----------------------------------------------------------------
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # -----------------------------------------------------------------
+        self.assertEqual(sorted(completed), [0, 1, 2])
+
     # ---------------------------------------------------------------------
 
     def test_get_state(self):
@@ -275,6 +421,18 @@ class TestBurstHandler(unittest.TestCase):
         # -----------------------------------------------------------------
         self.assertRaises(ValueError, sut.BurstHandler, i2c_bus=i2c_bus, i2c_adr=0x4C, timeout_ms=0)
 
+    def test_invalid_hold_time_budget(self):
+        i2c_bus = sut.EmulatedI2C(state={})
+        # -----------------------------------------------------------------
+        # -----------------------------------------------------------------
+        self.assertRaises(ValueError, sut.BurstHandler, i2c_bus=i2c_bus, i2c_adr=0x4C, max_hold_ms=0)
+
+    def test_invalid_priority(self):
+        i2c_bus = sut.EmulatedI2C(state={})
+        # -----------------------------------------------------------------
+        # -----------------------------------------------------------------
+        self.assertRaises(ValueError, sut.BurstHandler, i2c_bus=i2c_bus, i2c_adr=0x4C, priority=1.5)
+
     def test_hard_to_lock(self):
         state = {
             0x4C: {
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+perform device model related tests
+"""
+
+import errno
+import unittest
+
+import feeph.i2c as sut  # sytem under test
+
+MS = 1000 * 1000  # 1 millisecond in nanoseconds
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now_ns = 0
+
+    def __call__(self) -> int:
+        return self.now_ns
+
+
+class TestRegisterDevice(unittest.TestCase):
+
+    def test_read_register(self):
+        device = sut.RegisterDevice(registers={0x00: 0x12})
+        i2c_bus = sut.EmulatedI2C(state={}, devices={0x4C: device})
+        # -----------------------------------------------------------------
+        with sut.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x4C) as bh:
+            computed = bh.read_register(0x00)
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, 0x12)
+
+    def test_read_register_multibyte(self):
+        # multi-byte values are read using the auto-incrementing pointer
+        device = sut.RegisterDevice(registers={0x10: 0x12, 0x11: 0x34})
+        i2c_bus = sut.EmulatedI2C(state={}, devices={0x4C: device})
+        # -----------------------------------------------------------------
+        with sut.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x4C) as bh:
+            computed = bh.read_register(0x10, byte_count=2)
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, 0x1234)
+        self.assertEqual(device.pointer, 0x12)
+
+    def test_write_register_multibyte(self):
+        device = sut.RegisterDevice()
+        i2c_bus = sut.EmulatedI2C(state={}, devices={0x4C: device})
+        # -----------------------------------------------------------------
+        with sut.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x4C) as bh:
+            bh.write_register(0x10, 0x1234, byte_count=2)
+        # -----------------------------------------------------------------
+        self.assertEqual(device.registers, {0x10: 0x12, 0x11: 0x34})
+
+    def test_no_auto_increment(self):
+        device = sut.RegisterDevice(registers={0x10: 0x12, 0x11: 0x34}, auto_increment=False)
+        i2c_bus = sut.EmulatedI2C(state={}, devices={0x4C: device})
+        # -----------------------------------------------------------------
+        with sut.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x4C) as bh:
+            computed = bh.read_register(0x10, byte_count=2)
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, 0x1212)
+
+    def test_unknown_register(self):
+        device = sut.RegisterDevice(default=0xFF)
+        i2c_bus = sut.EmulatedI2C(state={}, devices={0x4C: device})
+        # -----------------------------------------------------------------
+        with sut.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x4C) as bh:
+            computed = bh.read_register(0x42)
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, 0xFF)
+
+    def test_read_only_and_read_to_clear(self):
+        device = sut.RegisterDevice(registers={0x00: 0x12, 0x01: 0x34}, read_only=[0x00], read_to_clear=[0x01])
+        i2c_bus = sut.EmulatedI2C(state={}, devices={0x4C: device})
+        # -----------------------------------------------------------------
+        with sut.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x4C) as bh:
+            bh.write_register(0x00, 0x56)
+            computed = bh.read_registers([0x00, 0x01, 0x01])
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, [0x12, 0x34, 0x00])
+
+    def test_state(self):
+        device = sut.RegisterDevice(registers={0x05: 0x12})
+        i2c_bus = sut.EmulatedI2C(state={}, devices={0x4C: device})
+        # -----------------------------------------------------------------
+        with sut.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x4C) as bh:
+            bh.set_state(0x05)  # set the register pointer
+            computed = bh.get_state()
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, 0x12)
+
+    def test_inject_errors(self):
+        device = sut.RegisterDevice(registers={0x00: 0x12})
+        i2c_bus = sut.EmulatedI2C(state={}, devices={0x4C: device})
+        # -----------------------------------------------------------------
+        device.inject_errors(count=2)
+        with sut.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x4C) as bh:
+            computed = bh.read_register(0x00, max_tries=3)
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, 0x12)
+
+    def test_inject_errors_exhausts_retries(self):
+        device = sut.RegisterDevice(registers={0x00: 0x12})
+        i2c_bus = sut.EmulatedI2C(state={}, devices={0x4C: device})
+        # -----------------------------------------------------------------
+        device.inject_errors(count=2, error=errno.EIO)
+        # -----------------------------------------------------------------
+        with sut.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x4C) as bh:
+            self.assertRaises(RuntimeError, bh.read_register, 0x00, max_tries=2)
+
+    def test_error_rate(self):
+        device = sut.RegisterDevice(seed=1)
+        i2c_bus = sut.EmulatedI2C(state={}, devices={0x4C: device})
+        device.set_error_rate(0.5)
+        # -----------------------------------------------------------------
+        errors = 0
+        for _ in range(100):
+            try:
+                i2c_bus.readfrom_into(0x4C, bytearray(1))
+            except OSError as e:
+                self.assertEqual(e.errno, errno.EREMOTEIO)
+                errors += 1
+        # -----------------------------------------------------------------
+        self.assertTrue(20 < errors < 80)
+
+    def test_invalid_error_rate(self):
+        device = sut.RegisterDevice()
+        # -----------------------------------------------------------------
+        # -----------------------------------------------------------------
+        self.assertRaises(ValueError, device.set_error_rate, 1.5)
+
+    def test_scan(self):
+        i2c_bus = sut.EmulatedI2C(state={0x70: {}}, devices={0x4C: sut.RegisterDevice()})
+        # -----------------------------------------------------------------
+        computed = sut.scan(i2c_bus=i2c_bus)
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, [0x4C, 0x70])
+
+    def test_not_implemented(self):
+        # -----------------------------------------------------------------
+        # -----------------------------------------------------------------
+        # 'read()' and 'write()' are abstract methods
+        self.assertRaises(TypeError, sut.EmulatedDevice)
+
+
+class TestFifoDevice(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.device = sut.FifoDevice(fifo_register=0x74, count_register=0x72, sample_rate_hz=100, sample_size=2, capacity=8,
+                                     generator=lambda idx: 0x0100 + idx, clock=self.clock)
+        self.i2c_bus = sut.EmulatedI2C(state={}, devices={0x68: self.device})
+
+    def test_empty(self):
+        # -----------------------------------------------------------------
+        with sut.BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=0x68) as bh:
+            computed = [bh.read_register(0x72), bh.read_register(0x74, byte_count=2)]
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, [0, 0x0000])
+
+    def test_drain(self):
+        self.clock.now_ns = 50 * MS  # 5 samples at 100 Hz
+        # -----------------------------------------------------------------
+        with sut.BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=0x68) as bh:
+            count = bh.read_register(0x72)
+            computed = bh.read_registers([0x74] * count, byte_count=2, chunk_size=2)
+            remaining = bh.read_register(0x72)
+        # -----------------------------------------------------------------
+        self.assertEqual(count, 5)
+        self.assertEqual(computed, [0x0100, 0x0101, 0x0102, 0x0103, 0x0104])
+        self.assertEqual(remaining, 0)
+
+    def test_overflow(self):
+        self.clock.now_ns = 100 * MS  # 10 samples, capacity is 8
+        # -----------------------------------------------------------------
+        with sut.BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=0x68) as bh:
+            count = bh.read_register(0x72)
+            first = bh.read_register(0x74, byte_count=2)
+        # -----------------------------------------------------------------
+        self.assertEqual(count, 8)
+        self.assertEqual(first, 0x0102)
+        self.assertEqual(self.device.overflows, 2)
+
+    def test_long_pause(self):
+        self.clock.now_ns = 3600 * 1000 * MS  # one hour without reading
+        # -----------------------------------------------------------------
+        computed = self.device.available
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, 8)
+        self.assertEqual(self.device.overflows, 360_000 - 8)
+
+    def test_regular_registers(self):
+        device = sut.FifoDevice(fifo_register=0x74, registers={0x00: 0x68})
+        i2c_bus = sut.EmulatedI2C(state={}, devices={0x68: device})
+        # -----------------------------------------------------------------
+        with sut.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x68) as bh:
+            computed = bh.read_register(0x00)
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, 0x68)
+
+    def test_invalid_parameters(self):
+        # -----------------------------------------------------------------
+        # -----------------------------------------------------------------
+        self.assertRaises(ValueError, sut.FifoDevice, fifo_register=0x74, sample_rate_hz=0)
+        self.assertRaises(ValueError, sut.FifoDevice, fifo_register=0x74, sample_size=0)
+        self.assertRaises(ValueError, sut.FifoDevice, fifo_register=0x74, capacity=0)
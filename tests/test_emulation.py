@@ -34,3 +34,11 @@ class TestEmulatedI2C(unittest.TestCase):
         # -----------------------------------------------------------------
         # -----------------------------------------------------------------
         self.assertRaises(ValueError, i2c_bus.writeto_then_readfrom, 0x12, [-1, 0x00], bytearray(0))
+
+    def test_unknown_device(self):
+        i2c_bus = sut.EmulatedI2C(state={})
+        # -----------------------------------------------------------------
+        # -----------------------------------------------------------------
+        self.assertRaises(OSError, i2c_bus.readfrom_into, 0x12, bytearray(1))
+        self.assertRaises(OSError, i2c_bus.writeto, 0x12, bytearray(1))
+        self.assertRaises(OSError, i2c_bus.writeto_then_readfrom, 0x12, bytearray(1), bytearray(1))
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+perform Linux i2c-dev backend related tests
+
+The ioctl layer is mocked, no hardware is required.
+"""
+
+import errno
+import unittest
+from unittest import mock
+
+import feeph.i2c
+import feeph.i2c.linux as sut  # sytem under test
+
+
+class FakeKernel:
+    """
+    emulate the I2C_RDWR ioctl for a single device with 8-bit registers
+    """
+
+    def __init__(self, i2c_adr: int, registers: dict[int, int]):
+        self.i2c_adr = i2c_adr
+        self.registers = registers
+        self.pointer = 0
+        self.ioctls: list[list[tuple[int, int, bytes]]] = list()
+
+    def ioctl(self, fd, request, arg):
+        assert request == sut.I2C_RDWR
+        messages = list()
+        for idx in range(arg.nmsgs):
+            msg = arg.msgs[idx]
+            if msg.addr != self.i2c_adr:
+                raise OSError(errno.EREMOTEIO, "Remote I/O error")
+            if msg.flags & sut.I2C_M_RD:
+                for pos in range(msg.len):
+                    msg.buf[pos] = self.registers.get(self.pointer, 0x00)
+                    self.pointer += 1
+                messages.append((msg.addr, msg.flags, bytes(msg.buf[:msg.len])))
+            else:
+                data = bytes(msg.buf[:msg.len])
+                if data:
+                    self.pointer = data[0]
+                    for pos, value in enumerate(data[1:]):
+                        self.registers[self.pointer + pos] = value
+                messages.append((msg.addr, msg.flags, data))
+        self.ioctls.append(messages)
+
+
+# pylint: disable=protected-access
+class TestLinuxI2C(unittest.TestCase):
+
+    def setUp(self):
+        self.kernel = FakeKernel(i2c_adr=0x4C, registers={0x00: 0x12, 0x01: 0x34, 0x10: 0x56})
+        patchers = [
+            mock.patch("os.open", return_value=99),
+            mock.patch("os.close"),
+            mock.patch("fcntl.flock"),
+            mock.patch("fcntl.ioctl", side_effect=self.kernel.ioctl),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.i2c_bus = sut.LinuxI2C(bus_id=1)
+        self.addCleanup(self.i2c_bus.deinit)
+
+    def test_read_register(self):
+        # -----------------------------------------------------------------
+        with feeph.i2c.BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=0x4C) as bh:
+            computed = bh.read_register(0x01)
+        expected = 0x34
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, expected)
+        # write-then-read is combined into a single ioctl
+        self.assertEqual(self.kernel.ioctls, [[(0x4C, 0, b"\x01"), (0x4C, sut.I2C_M_RD, b"\x34")]])
+
+    def test_write_register(self):
+        # -----------------------------------------------------------------
+        with feeph.i2c.BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=0x4C) as bh:
+            bh.write_register(0x10, 0x78)
+        # -----------------------------------------------------------------
+        self.assertEqual(self.kernel.registers[0x10], 0x78)
+        self.assertEqual(self.kernel.ioctls, [[(0x4C, 0, b"\x10\x78")]])
+
+    def test_get_state(self):
+        # -----------------------------------------------------------------
+        with feeph.i2c.BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=0x4C) as bh:
+            computed = bh.get_state()
+        expected = 0x12
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, expected)
+        self.assertEqual(self.kernel.ioctls, [[(0x4C, sut.I2C_M_RD, b"\x12")]])
+
+    def test_scatter_read(self):
+        # -----------------------------------------------------------------
+        with feeph.i2c.BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=0x4C) as bh:
+            computed = bh.read_registers([0x10, 0x00, 0x01])
+        expected = [0x56, 0x12, 0x34]
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, expected)
+        self.assertEqual(len(self.kernel.ioctls), 1)
+        self.assertEqual([msg[2] for msg in self.kernel.ioctls[0]], [b"\x10", b"\x56", b"\x00", b"\x12", b"\x01", b"\x34"])
+
+    def test_scatter_read_split(self):
+        # more registers than fit into a single ioctl
+        registers = list(range(0x20, 0x20 + 30))
+        # -----------------------------------------------------------------
+        computed = self.i2c_bus.scatter_read(0x4C, registers, byte_count=2)
+        # -----------------------------------------------------------------
+        self.assertEqual(len(computed), 30)
+        self.assertEqual([len(x) for x in self.kernel.ioctls], [42, 18])
+
+    def test_scatter_read_chunked(self):
+        # -----------------------------------------------------------------
+        with feeph.i2c.BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=0x4C) as bh:
+            bh.read_registers([0x00, 0x01, 0x10], chunk_size=2)
+        # -----------------------------------------------------------------
+        self.assertEqual([len(x) for x in self.kernel.ioctls], [4, 2])
+
+    def test_scatter_read_retry(self):
+        registers = list(range(0x20, 0x20 + 30))
+        calls = list()
+
+        def ioctl(fd, request, arg):
+            calls.append(arg.nmsgs)
+            if len(calls) == 2:
+                # the second ioctl fails once
+                raise OSError(errno.EREMOTEIO, "Remote I/O error")
+            self.kernel.ioctl(fd, request, arg)
+        # -----------------------------------------------------------------
+        with mock.patch("fcntl.ioctl", side_effect=ioctl):
+            with feeph.i2c.BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=0x4C) as bh:
+                computed = bh.read_registers(registers)
+        # -----------------------------------------------------------------
+        self.assertEqual(len(computed), 30)
+        # only the failed ioctl is repeated
+        self.assertEqual(calls, [42, 18, 18])
+
+    def test_scatter_read_error(self):
+        # -----------------------------------------------------------------
+        # -----------------------------------------------------------------
+        with feeph.i2c.BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=0x4D) as bh:
+            self.assertRaises(RuntimeError, bh.read_registers, [0x00, 0x01], max_tries=2)
+        self.assertEqual(len(self.kernel.ioctls), 0)
+
+    def test_buffer_slices(self):
+        buf = bytearray(4)
+        # -----------------------------------------------------------------
+        self.i2c_bus.writeto_then_readfrom(0x4C, bytearray([0xFF, 0x00]), buf, out_start=1, in_start=1, in_end=3)
+        # -----------------------------------------------------------------
+        self.assertEqual(buf, bytearray([0x00, 0x12, 0x34, 0x00]))
+
+    def test_buffers_are_released(self):
+        buf = bytearray(1)
+        # -----------------------------------------------------------------
+        self.i2c_bus.readfrom_into(0x4C, buf)
+        results = self.i2c_bus.scatter_read(0x4C, [0x00, 0x01])
+        # -----------------------------------------------------------------
+        # raises a BufferError if the buffers are still exported
+        buf.append(0x00)
+        results[0].append(0x00)
+        self.assertEqual(buf, bytearray([0x12, 0x00]))
+
+    def test_scan(self):
+        # -----------------------------------------------------------------
+        computed = self.i2c_bus.scan()
+        expected = [0x4C]
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, expected)
+
+    def test_lock(self):
+        # -----------------------------------------------------------------
+        first = self.i2c_bus.try_lock()
+        second = self.i2c_bus.try_lock()
+        self.i2c_bus.unlock()
+        third = self.i2c_bus.try_lock()
+        self.i2c_bus.unlock()
+        # -----------------------------------------------------------------
+        self.assertEqual([first, second, third], [True, False, True])
+
+    def test_locked_by_other_process(self):
+        # -----------------------------------------------------------------
+        with mock.patch("fcntl.flock", side_effect=BlockingIOError(errno.EWOULDBLOCK, "locked")):
+            computed = self.i2c_bus.try_lock()
+        # -----------------------------------------------------------------
+        self.assertFalse(computed)
+        self.assertFalse(self.i2c_bus._lock.locked())
+
+    def test_too_many_messages(self):
+        messages = [(0x4C, sut.I2C_M_RD, sut._as_ctypes(bytearray(1)))] * 43
+        # -----------------------------------------------------------------
+        # -----------------------------------------------------------------
+        self.assertRaises(ValueError, self.i2c_bus._transfer, messages)
+
+    def test_closed(self):
+        self.i2c_bus.deinit()
+        # -----------------------------------------------------------------
+        # -----------------------------------------------------------------
+        self.assertRaises(RuntimeError, self.i2c_bus.readfrom_into, 0x4C, bytearray(1))
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+perform I²C multiplexer related tests
+"""
+
+import threading
+import unittest
+
+import feeph.i2c as sut  # sytem under test
+
+
+# pylint: disable=protected-access
+class TestMultiplexer(unittest.TestCase):
+
+    def setUp(self):
+        self.state = {
+            0x70: {-1: 0x00},
+            0x48: {0x00: 0x12},
+            0x49: {0x00: 0x34},
+            0x4A: {0x00: 0x56},
+            0x4B: {0x00: 0x78},
+        }
+        self.i2c_bus = sut.EmulatedI2C(state=self.state)
+        self.mux = sut.I2CMultiplexer(i2c_bus=self.i2c_bus, i2c_adr=0x70)
+
+    def test_select_channel(self):
+        # -----------------------------------------------------------------
+        with sut.BurstHandler(i2c_bus=self.mux.channel(3), i2c_adr=0x48) as bh:
+            computed = bh.read_register(0x00)
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, 0x12)
+        self.assertEqual(self.i2c_bus._state[0x70][-1], 0b0000_1000)
+        self.assertEqual(self.mux.selected, 3)
+
+    def test_skip_redundant_select(self):
+        # -----------------------------------------------------------------
+        for i2c_adr in (0x48, 0x49):
+            with sut.BurstHandler(i2c_bus=self.mux.channel(2), i2c_adr=i2c_adr) as bh:
+                bh.read_register(0x00)
+                bh.write_register(0x01, 0x00)
+        # -----------------------------------------------------------------
+        self.assertEqual(self.mux.channel_switches, 1)
+
+    def test_invalidate(self):
+        # -----------------------------------------------------------------
+        with sut.BurstHandler(i2c_bus=self.mux.channel(2), i2c_adr=0x48) as bh:
+            bh.read_register(0x00)
+        self.mux.invalidate()
+        with sut.BurstHandler(i2c_bus=self.mux.channel(2), i2c_adr=0x48) as bh:
+            bh.read_register(0x00)
+        # -----------------------------------------------------------------
+        self.assertEqual(self.mux.channel_switches, 2)
+
+    def test_run_grouped(self):
+        # 32 sensors behind 4 channels, queued in an unfavorable order
+        jobs = list()
+        for i2c_adr in (0x48, 0x49, 0x4A, 0x4B) * 2:
+            for channel in range(4):
+                jobs.append((channel, i2c_adr, lambda bh: bh.read_register(0x00)))
+        # -----------------------------------------------------------------
+        computed = self.mux.run_grouped(jobs)
+        expected = [self.state[i2c_adr][0x00] for _, i2c_adr, _ in jobs]
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, expected)
+        self.assertEqual(self.mux.channel_switches, 4)
+
+    def test_run_grouped_starts_with_selected_channel(self):
+        with sut.BurstHandler(i2c_bus=self.mux.channel(5), i2c_adr=0x48) as bh:
+            bh.read_register(0x00)
+        jobs = [(channel, 0x48, lambda bh: bh.read_register(0x00)) for channel in (1, 5, 1, 5)]
+        # -----------------------------------------------------------------
+        self.mux.run_grouped(jobs)
+        # -----------------------------------------------------------------
+        self.assertEqual(self.mux.channel_switches, 2)
+        self.assertEqual(self.mux.selected, 1)
+
+    def test_missing_multiplexer(self):
+        mux = sut.I2CMultiplexer(i2c_bus=self.i2c_bus, i2c_adr=0x71)
+        # -----------------------------------------------------------------
+        # -----------------------------------------------------------------
+        with sut.BurstHandler(i2c_bus=mux.channel(0), i2c_adr=0x48) as bh:
+            self.assertRaises(RuntimeError, bh.read_register, 0x00, max_tries=1)
+        self.assertIsNone(mux.selected)
+        self.assertEqual(mux.channel_switches, 0)
+
+    def test_state_access(self):
+        # -----------------------------------------------------------------
+        with sut.BurstHandler(i2c_bus=self.mux.channel(1), i2c_adr=0x4B) as bh:
+            bh.set_state(0x01)
+            computed = bh.get_state()
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, 0x01)
+
+    def test_shared_arbiter(self):
+        # -----------------------------------------------------------------
+        computed = [sut.burst_handler._get_arbiter(self.mux.channel(channel)) for channel in (0, 1)]
+        expected = sut.burst_handler._get_arbiter(self.i2c_bus)
+        # -----------------------------------------------------------------
+        self.assertIs(computed[0], expected)
+        self.assertIs(computed[1], expected)
+
+    def test_priority_across_channels(self):
+        arbiter = sut.burst_handler._get_arbiter(self.i2c_bus)
+        # -----------------------------------------------------------------
+        bhr = sut.BurstHandler(i2c_bus=self.mux.channel(0), i2c_adr=0x48)
+        with bhr as bh:
+            # simulate a burst with a higher priority waiting for another
+            # channel (it gives up after 20 ms)
+            ticket = arbiter.register(priority=5)
+            timer = threading.Timer(0.02, arbiter.unregister, args=[ticket])
+            timer.start()
+            bh.read_registers([0x00] * 3, chunk_size=1)
+        # -----------------------------------------------------------------
+        timer.join()
+        self.assertEqual(bhr.statistics.yields, 1)
+
+    def test_parent_with_busio_signature(self):
+        class BusioI2C(sut.EmulatedI2C):
+            # same signature as busio.I2C.readfrom_into() (no 'stop')
+            def readfrom_into(self, address: int, buffer: bytearray, *, start=0, end=None):  # type: ignore[override]
+                super().readfrom_into(address=address, buffer=buffer, start=start, end=end)
+
+        i2c_bus = BusioI2C(state=self.state)
+        mux = sut.I2CMultiplexer(i2c_bus=i2c_bus, i2c_adr=0x70)
+        # -----------------------------------------------------------------
+        with sut.BurstHandler(i2c_bus=mux.channel(1), i2c_adr=0x4B) as bh:
+            computed = bh.get_state()
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, 0x00)
+
+    def test_invalid_channel(self):
+        # -----------------------------------------------------------------
+        # -----------------------------------------------------------------
+        self.assertRaises(ValueError, self.mux.channel, 8)
+        self.assertRaises(ValueError, self.mux.run_grouped, [(8, 0x48, lambda bh: None)])
+
+    def test_invalid_channel_count(self):
+        # -----------------------------------------------------------------
+        # -----------------------------------------------------------------
+        self.assertRaises(ValueError, sut.I2CMultiplexer, i2c_bus=self.i2c_bus, channel_count=9)
+
+    def test_invalid_address(self):
+        # -----------------------------------------------------------------
+        # -----------------------------------------------------------------
+        self.assertRaises(ValueError, sut.I2CMultiplexer, i2c_bus=self.i2c_bus, i2c_adr=0x100)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+perform adaptive polling related tests
+"""
+
+import asyncio
+import threading
+import unittest
+
+import feeph.i2c as sut  # sytem under test
+
+MS = 1000 * 1000  # 1 millisecond in nanoseconds
+
+
+# pylint: disable=protected-access
+class TestAdaptivePoller(unittest.TestCase):
+
+    def setUp(self):
+        self.state = {
+            0x4C: {
+                0x00: 0x12,
+                0x10: 0x01,
+                0x11: 0x02,
+            },
+        }
+        self.i2c_bus = sut.EmulatedI2C(state=self.state)
+        self.poller = sut.AdaptivePoller(i2c_bus=self.i2c_bus)
+
+    def test_initial_read(self):
+        changes = list()
+        self.poller.watch(i2c_adr=0x4C, register=0x00, callback=changes.append)
+        # -----------------------------------------------------------------
+        computed = self.poller.poll_once(now_ns=0)
+        expected = [sut.RegisterChange(i2c_adr=0x4C, register=0x00, old_value=None, new_value=0x12, timestamp_ns=0)]
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, 1)
+        self.assertEqual(changes, expected)
+
+    def test_backoff(self):
+        watched = self.poller.watch(i2c_adr=0x4C, register=0x00, min_period_ms=10, max_period_ms=40)
+        # -----------------------------------------------------------------
+        periods = list()
+        now_ns = 0
+        for _ in range(5):
+            self.poller.poll_once(now_ns=now_ns)
+            periods.append(watched.period_ns // MS)
+            now_ns = watched.due_ns
+        # -----------------------------------------------------------------
+        self.assertEqual(periods, [10, 20, 40, 40, 40])
+
+    def test_not_due(self):
+        self.poller.watch(i2c_adr=0x4C, register=0x00, min_period_ms=10)
+        # -----------------------------------------------------------------
+        self.poller.poll_once(now_ns=0)
+        computed = self.poller.poll_once(now_ns=5 * MS)
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, 0)
+        self.assertEqual(self.poller.next_due_ns(), 10 * MS)
+
+    def test_snap_back_on_change(self):
+        changes = list()
+        watched = self.poller.watch(i2c_adr=0x4C, register=0x00, min_period_ms=10, max_period_ms=1000, callback=changes.append)
+        self.poller.poll_once(now_ns=0)
+        self.poller.poll_once(now_ns=watched.due_ns)
+        self.poller.poll_once(now_ns=watched.due_ns)
+        # -----------------------------------------------------------------
+        self.state[0x4C][0x00] = 0x13
+        self.poller.poll_once(now_ns=watched.due_ns)
+        # -----------------------------------------------------------------
+        self.assertEqual(watched.period_ns, 10 * MS)
+        self.assertEqual([(x.old_value, x.new_value) for x in changes], [(None, 0x12), (0x12, 0x13)])
+
+    def test_deadband(self):
+        changes = list()
+        watched = self.poller.watch(i2c_adr=0x4C, register=0x00, deadband=2, callback=changes.append)
+        self.poller.poll_once(now_ns=0)
+        # -----------------------------------------------------------------
+        self.state[0x4C][0x00] = 0x14  # within deadband
+        self.poller.poll_once(now_ns=watched.due_ns)
+        self.state[0x4C][0x00] = 0x15  # exceeds deadband (compared to 0x12)
+        self.poller.poll_once(now_ns=watched.due_ns)
+        # -----------------------------------------------------------------
+        self.assertEqual([x.new_value for x in changes], [0x12, 0x15])
+
+    def test_block(self):
+        changes = list()
+        watched = self.poller.watch(i2c_adr=0x4C, register=0x10, count=2, callback=changes.append)
+        self.poller.poll_once(now_ns=0)
+        # -----------------------------------------------------------------
+        self.state[0x4C][0x11] = 0x03
+        computed = self.poller.poll_once(now_ns=watched.due_ns)
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, 2)
+        self.assertEqual([x.new_value for x in changes], [(0x01, 0x02), (0x01, 0x03)])
+
+    def test_read_error(self):
+        changes = list()
+        watched = self.poller.watch(i2c_adr=0x4D, register=0x00, min_period_ms=10, callback=changes.append)
+        # -----------------------------------------------------------------
+        computed = self.poller.poll_once(now_ns=0)
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, 0)
+        self.assertEqual(changes, [])
+        self.assertEqual(watched.due_ns, 10 * MS)
+
+    def test_failing_callback(self):
+        def callback(change):
+            raise ValueError(change)
+        self.poller.watch(i2c_adr=0x4C, register=0x00, callback=callback)
+        # -----------------------------------------------------------------
+        computed = self.poller.poll_once(now_ns=0)
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, 1)
+
+    def test_unwatch(self):
+        watched = self.poller.watch(i2c_adr=0x4C, register=0x00)
+        # -----------------------------------------------------------------
+        self.poller.unwatch(watched)
+        computed = self.poller.poll_once(now_ns=0)
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, 0)
+        self.assertIsNone(self.poller.next_due_ns())
+
+    def test_background_thread(self):
+        received = threading.Event()
+        self.poller.watch(i2c_adr=0x4C, register=0x00, callback=lambda change: received.set())
+        # -----------------------------------------------------------------
+        self.poller.start()
+        computed = received.wait(timeout=1)
+        self.poller.stop()
+        # -----------------------------------------------------------------
+        self.assertTrue(computed)
+
+    def test_async_iterator(self):
+        self.poller.watch(i2c_adr=0x4C, register=0x00)
+
+        async def consume():
+            changes = self.poller.changes()
+            # subscribe before polling
+            pending = asyncio.ensure_future(changes.__anext__())
+            await asyncio.sleep(0)
+            self.poller.poll_once(now_ns=0)
+            change = await asyncio.wait_for(pending, timeout=1)
+            await changes.aclose()
+            return change
+        # -----------------------------------------------------------------
+        computed = asyncio.run(consume())
+        # -----------------------------------------------------------------
+        self.assertEqual(computed.new_value, 0x12)
+        self.assertEqual(self.poller._subscribers, [])
+
+    def test_invalid_parameters(self):
+        # -----------------------------------------------------------------
+        # -----------------------------------------------------------------
+        self.assertRaises(ValueError, self.poller.watch, i2c_adr=0x100, register=0x00)
+        self.assertRaises(ValueError, self.poller.watch, i2c_adr=0x4C, register=0xFF, count=2)
+        self.assertRaises(ValueError, self.poller.watch, i2c_adr=0x4C, register=0x00, count=0)
+        self.assertRaises(ValueError, self.poller.watch, i2c_adr=0x4C, register=0x00, byte_count=0)
+        self.assertRaises(ValueError, self.poller.watch, i2c_adr=0x4C, register=0x00, min_period_ms=20, max_period_ms=10)
+        self.assertRaises(ValueError, self.poller.watch, i2c_adr=0x4C, register=0x00, deadband=-1)
+        self.assertRaises(ValueError, sut.AdaptivePoller, i2c_bus=self.i2c_bus, backoff_factor=0.5)
+        self.assertRaises(ValueError, sut.AdaptivePoller, i2c_bus=self.i2c_bus, timeout_ms=0)
+        self.assertRaises(ValueError, sut.AdaptivePoller, i2c_bus=self.i2c_bus, timeout_ms=0.5)
+        self.assertRaises(ValueError, sut.AdaptivePoller, i2c_bus=self.i2c_bus, priority="high")
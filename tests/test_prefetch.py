@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+perform prefetch related tests
+"""
+
+import threading
+import time
+import unittest
+
+import feeph.i2c as sut  # sytem under test
+
+
+class TestPrefetcher(unittest.TestCase):
+
+    def setUp(self):
+        self.state = {
+            0x4C: {
+                0x00: 0x12,
+                0x10: 0x01,
+                0x11: 0x02,
+                0x12: 0x03,
+            },
+            0x70: {
+                0x00: 0x34,
+            },
+        }
+        self.i2c_bus = sut.EmulatedI2C(state=self.state)
+        self.prefetcher = sut.Prefetcher(i2c_bus=self.i2c_bus, interval_ms=10)
+
+    def test_refresh(self):
+        self.prefetcher.add(i2c_adr=0x4C, register=0x00)
+        self.prefetcher.add(i2c_adr=0x4C, register=0x10, count=3)
+        self.prefetcher.add(i2c_adr=0x70, register=0x00)
+        # -----------------------------------------------------------------
+        snapshot = self.prefetcher.refresh()
+        computed = [snapshot.get(0x4C, register) for register in (0x00, 0x10, 0x11, 0x12)] + [snapshot.get(0x70, 0x00)]
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, [0x12, 0x01, 0x02, 0x03, 0x34])
+        self.assertEqual(snapshot.version, 1)
+        self.assertIs(self.prefetcher.snapshot(), snapshot)
+
+    def test_multibyte_block(self):
+        self.prefetcher.add(i2c_adr=0x4C, register=0x10, count=2, byte_count=2)
+        # -----------------------------------------------------------------
+        self.prefetcher.refresh()
+        computed = [self.prefetcher.get(0x4C, 0x10), self.prefetcher.get(0x4C, 0x12)]
+        # -----------------------------------------------------------------
+        # EmulatedI2C keeps multi-byte values in a single register
+        self.assertEqual(computed, [0x01, 0x03])
+        self.assertNotIn((0x4C, 0x11), self.prefetcher.snapshot())
+
+    def test_concurrent_refresh(self):
+        class SlowI2C(sut.EmulatedI2C):
+            def writeto_then_readfrom(self, *args, **kwargs):
+                # give other threads a chance to interfere
+                time.sleep(0.001)
+                super().writeto_then_readfrom(*args, **kwargs)
+
+        prefetcher = sut.Prefetcher(i2c_bus=SlowI2C(state=self.state))
+        prefetcher.add(i2c_adr=0x4C, register=0x00)
+        versions = list()
+
+        def refresh():
+            for _ in range(5):
+                versions.append(prefetcher.refresh().version)
+
+        threads = [threading.Thread(target=refresh) for _ in range(4)]
+        # -----------------------------------------------------------------
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # -----------------------------------------------------------------
+        # each refresh publishes its own version
+        self.assertEqual(sorted(versions), list(range(1, 21)))
+        self.assertEqual(prefetcher.snapshot().version, 20)
+
+    def test_snapshot_is_immutable(self):
+        self.prefetcher.add(i2c_adr=0x4C, register=0x00)
+        snapshot1 = self.prefetcher.refresh()
+        # -----------------------------------------------------------------
+        self.state[0x4C][0x00] = 0x13
+        snapshot2 = self.prefetcher.refresh()
+        # -----------------------------------------------------------------
+        self.assertEqual(snapshot1.get(0x4C, 0x00), 0x12)
+        self.assertEqual(snapshot2.get(0x4C, 0x00), 0x13)
+        self.assertEqual(snapshot2.version, 2)
+
+    def test_no_value(self):
+        # -----------------------------------------------------------------
+        # -----------------------------------------------------------------
+        self.assertRaises(RuntimeError, self.prefetcher.get, 0x4C, 0x00)
+        self.assertRaises(RuntimeError, self.prefetcher.snapshot().get_timestamp_ns, 0x4C, 0x00)
+
+    def test_stale(self):
+        self.prefetcher.add(i2c_adr=0x4C, register=0x00)
+        self.prefetcher.refresh()
+        # -----------------------------------------------------------------
+        time.sleep(0.01)
+        # -----------------------------------------------------------------
+        self.assertEqual(self.prefetcher.get(0x4C, 0x00, max_age_ms=1000), 0x12)
+        self.assertRaises(RuntimeError, self.prefetcher.get, 0x4C, 0x00, max_age_ms=5)
+
+    def test_carry_over_on_error(self):
+        self.prefetcher.add(i2c_adr=0x4C, register=0x00)
+        snapshot1 = self.prefetcher.refresh()
+        # -----------------------------------------------------------------
+        del self.i2c_bus._state[0x4C]  # pylint: disable=protected-access
+        snapshot2 = self.prefetcher.refresh()
+        # -----------------------------------------------------------------
+        self.assertEqual(snapshot2.get(0x4C, 0x00), 0x12)
+        self.assertEqual(snapshot2.get_timestamp_ns(0x4C, 0x00), snapshot1.get_timestamp_ns(0x4C, 0x00))
+
+    def test_background_thread(self):
+        self.prefetcher.add(i2c_adr=0x4C, register=0x00)
+        # -----------------------------------------------------------------
+        self.prefetcher.start()
+        deadline = time.monotonic() + 1
+        while self.prefetcher.snapshot().version < 3 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        self.prefetcher.stop()
+        # -----------------------------------------------------------------
+        self.assertGreaterEqual(self.prefetcher.snapshot().version, 3)
+        self.assertEqual(self.prefetcher.get(0x4C, 0x00), 0x12)
+
+    def test_start_twice(self):
+        self.prefetcher.start()
+        # -----------------------------------------------------------------
+        # -----------------------------------------------------------------
+        self.assertRaises(RuntimeError, self.prefetcher.start)
+        self.prefetcher.stop()
+
+    def test_invalid_parameters(self):
+        # -----------------------------------------------------------------
+        # -----------------------------------------------------------------
+        self.assertRaises(ValueError, sut.Prefetcher, i2c_bus=self.i2c_bus, interval_ms=0)
+        self.assertRaises(ValueError, sut.Prefetcher, i2c_bus=self.i2c_bus, timeout_ms=0)
+        self.assertRaises(ValueError, sut.Prefetcher, i2c_bus=self.i2c_bus, priority=1.5)
+        self.assertRaises(ValueError, sut.Prefetcher, i2c_bus=self.i2c_bus, chunk_size=0)
+        self.assertRaises(ValueError, self.prefetcher.add, i2c_adr=0x100, register=0x00)
+        self.assertRaises(ValueError, self.prefetcher.add, i2c_adr=0x4C, register=0xFF, count=2)
+        self.assertRaises(ValueError, self.prefetcher.add, i2c_adr=0x4C, register=0x00, count=0)
+        self.assertRaises(ValueError, self.prefetcher.add, i2c_adr=0x4C, register=0x00, byte_count=0)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+perform I²C bus scan related tests
+"""
+
+import time
+import unittest
+
+import feeph.i2c as sut  # sytem under test
+
+
+class CountingI2C(sut.EmulatedI2C):
+    """
+    count the number of probes per address
+    """
+
+    def __init__(self, state: dict[int, dict[int, int]]):
+        super().__init__(state=state)
+        self.probes: dict[int, int] = {}
+
+    # pylint: disable=too-many-arguments
+    def readfrom_into(self, address: int, buffer: bytearray, *, start=0, end=None, stop=True):
+        self.probes[address] = self.probes.get(address, 0) + 1
+        super().readfrom_into(address, buffer, start=start, end=end, stop=stop)
+
+
+class TestScan(unittest.TestCase):
+
+    def test_scan(self):
+        i2c_bus = CountingI2C(state={0x4C: {0x00: 0x12}, 0x70: {-1: 0x00}})
+        # -----------------------------------------------------------------
+        computed = sut.scan(i2c_bus=i2c_bus)
+        expected = [0x4C, 0x70]
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, expected)
+        # each address is probed exactly once (no retries)
+        self.assertEqual(set(i2c_bus.probes.values()), {1})
+        self.assertEqual(len(i2c_bus.probes), 0x78 - 0x08)
+
+    def test_scan_range(self):
+        i2c_bus = CountingI2C(state={0x4C: {}, 0x70: {}})
+        # -----------------------------------------------------------------
+        computed = sut.scan(i2c_bus=i2c_bus, addresses=range(0x48, 0x50))
+        expected = [0x4C]
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, expected)
+        self.assertEqual(sorted(i2c_bus.probes), list(range(0x48, 0x50)))
+
+    def test_scan_cached(self):
+        i2c_bus = CountingI2C(state={0x4C: {}})
+        presence_cache = sut.PresenceCache()
+        # -----------------------------------------------------------------
+        computed1 = sut.scan(i2c_bus=i2c_bus, addresses=[0x4C, 0x4D], presence_cache=presence_cache)
+        computed2 = sut.scan(i2c_bus=i2c_bus, addresses=[0x4C, 0x4D], presence_cache=presence_cache)
+        # -----------------------------------------------------------------
+        self.assertEqual(computed1, [0x4C])
+        self.assertEqual(computed2, [0x4C])
+        self.assertEqual(i2c_bus.probes, {0x4C: 1, 0x4D: 1})
+
+    def test_scan_refresh(self):
+        i2c_bus = CountingI2C(state={0x4C: {}})
+        presence_cache = sut.PresenceCache()
+        # -----------------------------------------------------------------
+        sut.scan(i2c_bus=i2c_bus, addresses=[0x4C, 0x4D], presence_cache=presence_cache)
+        i2c_bus._state[0x4D] = {}  # pylint: disable=protected-access
+        computed = sut.scan(i2c_bus=i2c_bus, addresses=[0x4C, 0x4D], presence_cache=presence_cache, refresh=True)
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, [0x4C, 0x4D])
+        self.assertEqual(presence_cache.get(i2c_bus, 0x4D), True)
+
+    def test_scan_buses(self):
+        i2c_bus1 = sut.EmulatedI2C(state={0x4C: {}})
+        i2c_bus2 = sut.EmulatedI2C(state={0x70: {}})
+        # -----------------------------------------------------------------
+        computed = sut.scan_buses([i2c_bus1, i2c_bus2])
+        # -----------------------------------------------------------------
+        self.assertEqual(computed[i2c_bus1], [0x4C])
+        self.assertEqual(computed[i2c_bus2], [0x70])
+
+    def test_scan_no_buses(self):
+        # -----------------------------------------------------------------
+        # -----------------------------------------------------------------
+        self.assertEqual(sut.scan_buses([]), {})
+
+    def test_invalid_address(self):
+        i2c_bus = sut.EmulatedI2C(state={})
+        # -----------------------------------------------------------------
+        # -----------------------------------------------------------------
+        self.assertRaises(ValueError, sut.scan, i2c_bus=i2c_bus, addresses=[0x100])
+
+    def test_invalid_chunk_size(self):
+        i2c_bus = sut.EmulatedI2C(state={})
+        # -----------------------------------------------------------------
+        # -----------------------------------------------------------------
+        self.assertRaises(ValueError, sut.scan, i2c_bus=i2c_bus, chunk_size=0)
+
+
+class TestPresenceCache(unittest.TestCase):
+
+    def test_fail_fast(self):
+        i2c_bus = sut.EmulatedI2C(state={0x4C: {0x00: 0x12}})
+        presence_cache = sut.PresenceCache()
+        sut.scan(i2c_bus=i2c_bus, addresses=[0x4C, 0x4D], presence_cache=presence_cache)
+        # -----------------------------------------------------------------
+        with sut.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x4C, presence_cache=presence_cache) as bh:
+            computed = bh.read_register(0x00)
+        bh_absent = sut.BurstHandler(i2c_bus=i2c_bus, i2c_adr=0x4D, presence_cache=presence_cache)
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, 0x12)
+        self.assertRaises(RuntimeError, bh_absent.__enter__)
+
+    def test_expired(self):
+        i2c_bus = sut.EmulatedI2C(state={})
+        presence_cache = sut.PresenceCache(ttl_ms=1)
+        # -----------------------------------------------------------------
+        presence_cache.set(i2c_bus, 0x4C, False)
+        time.sleep(0.005)
+        computed = presence_cache.get(i2c_bus, 0x4C)
+        # -----------------------------------------------------------------
+        self.assertIsNone(computed)
+
+    def test_invalidate(self):
+        i2c_bus1 = sut.EmulatedI2C(state={})
+        i2c_bus2 = sut.EmulatedI2C(state={})
+        presence_cache = sut.PresenceCache()
+        for i2c_bus in (i2c_bus1, i2c_bus2):
+            presence_cache.set(i2c_bus, 0x4C, True)
+            presence_cache.set(i2c_bus, 0x4D, False)
+        # -----------------------------------------------------------------
+        presence_cache.invalidate(i2c_bus1, 0x4C)
+        computed1 = [presence_cache.get(i2c_bus1, 0x4C), presence_cache.get(i2c_bus1, 0x4D)]
+        presence_cache.invalidate(i2c_bus1)
+        computed2 = [presence_cache.get(i2c_bus1, 0x4D), presence_cache.get(i2c_bus2, 0x4D)]
+        presence_cache.invalidate()
+        computed3 = [presence_cache.get(i2c_bus2, 0x4C)]
+        # -----------------------------------------------------------------
+        self.assertEqual(computed1, [None, False])
+        self.assertEqual(computed2, [None, False])
+        self.assertEqual(computed3, [None])
+
+    def test_invalid_ttl(self):
+        # -----------------------------------------------------------------
+        # -----------------------------------------------------------------
+        self.assertRaises(ValueError, sut.PresenceCache, ttl_ms=0)